@@ -1,11 +1,27 @@
 import logging
 import os
 import time
-import tkinter as tk
 import json
 import threading
 import requests
 import datetime
+import calendar
+import argparse
+import re
+import bisect
+import queue
+import sqlite3
+import http.server
+import functools
+import mmap
+import concurrent.futures
+import ctypes
+import ctypes.util
+import select
+import struct
+import socket
+import sys
+from collections import deque
 
 def setup_custom_logger(name):
     logging.basicConfig(level=logging.INFO,
@@ -21,48 +37,1645 @@ def setup_custom_logger(name):
     logger.addHandler(handler)
     return logger
 
-class OverlayApp:
-    def __init__(self):
-        # Initialize path and main window
-        self.path = None
-        self.root = tk.Tk()
-        self.root.overrideredirect(True)  
-        self.root.attributes("-topmost", True) 
-        self.root.geometry("10x10")
-        self.root.configure(bg='black')
-        self.root.attributes("-alpha", 0.5)
+DEFAULT_LOG_NAME = "EE.log"  # Name of the log followed when no --log is given, also used for imported runs
+WANTED_BOUNTIES_URL = "https://gist.githubusercontent.com/ManInTheWallPog/d9cc2c83379a74ef57f0407b0d84d9b2/raw/"
+BOUNTY_TRANSLATION_URL = "https://gist.githubusercontent.com/ManInTheWallPog/02dfd3efdd62ed5b7061dd2e62324fa3/raw/"
+
+def default_data_dir():
+    return os.path.join(os.getenv('LOCALAPPDATA') or os.path.expanduser(os.path.join("~", ".cache")), "AyaBountyTracker")
+
+class BountyData:
+    # Wanted bounties and stage translations, served from a disk cache and revalidated in the background
+    def __init__(self, cache_dir=None, wanted_url=WANTED_BOUNTIES_URL, translation_url=BOUNTY_TRANSLATION_URL, timeout=10):
+        self.cache_dir = cache_dir or default_data_dir()
+        self.sources = {"wanted_bounties": wanted_url, "bounty_translation": translation_url}
+        self.timeout = timeout
+        self.session = requests.Session()  # Reuses the connection for both tables
+        self.entries = {"wanted_bounties": {"data": []}, "bounty_translation": {"data": {}}}
+        self.tables = ([], {})  # (wanted_bounties, bounty_translation), replaced as a whole
+        self.listeners = []  # Called with the new tables after a refresh changed them
+        self.logger = logging.getLogger('Aya Bounty Tracker')
+
+    def cache_path(self, name):
+        return os.path.join(self.cache_dir, name + ".json")
+
+    def load(self):
+        # Start from whatever the last run cached, never touching the network
+        for name in self.sources:
+            try:
+                with open(self.cache_path(name), 'r', encoding="utf-8") as read_obj:
+                    self.entries[name] = json.load(read_obj)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                self.logger.error(f"Ignoring broken bounty cache {name}: {e}")
+        self.swap()
+        return self.tables
+
+    def save(self, name, entry):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = self.cache_path(name) + ".tmp"
+        with open(temp_path, 'w', encoding="utf-8") as write_obj:
+            json.dump(entry, write_obj)
+        os.replace(temp_path, self.cache_path(name))
+
+    def fetch(self, name):
+        # Conditional GET, returns True if the table changed
+        entry = self.entries[name]
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self.session.get(self.sources[name], headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return False
+        response.raise_for_status()
+
+        entry = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified"),
+                 "data": json.loads(response.content.decode('utf-8'))}
+        changed = entry["data"] != self.entries[name]["data"]
+        self.entries[name] = entry
+        self.save(name, entry)
+        return changed
+
+    def refresh(self):
+        changed = False
+        for name in self.sources:
+            try:
+                changed = self.fetch(name) or changed
+            except Exception as e:
+                self.logger.error(f"Could not refresh {name}, using cached copy: {e}")
+        if changed:
+            self.swap()
+            for listener in self.listeners:
+                listener(*self.tables)
+        return changed
+
+    def refresh_in_background(self):
+        threading.Thread(target=self.refresh, daemon=True).start()
+
+    def swap(self):
+        self.tables = (self.entries["wanted_bounties"]["data"], self.entries["bounty_translation"]["data"])
+
+def default_log_path():
+    return os.path.join(os.getenv('LOCALAPPDATA', ''), "Warframe", "EE.log")
+
+def read_log_lines(file_name, block_size=1 << 20):
+    # Stream a whole log in large blocks, decoding only complete lines
+    with open(file_name, 'rb') as read_obj:
+        buffer = b""
+        while True:
+            block = read_obj.read(block_size)
+            if not block:
+                break
+            buffer += block
+            last_newline = buffer.rfind(b"\n")
+            if last_newline == -1:
+                continue
+            for line in buffer[:last_newline].decode("utf-8", errors="ignore").split("\n"):
+                yield line.strip()
+            buffer = buffer[last_newline + 1:]
+        if buffer:
+            yield buffer.decode("utf-8", errors="ignore").strip()
+
+# Lines that open a bounty, searched for backwards when catching up on startup
+MISSION_MARKERS = [b"Net [Info]: Set squad mission:", b"ProcessSquadMessage received MISSION message",
+                   b"LoadLevelMsg received. Client joining mission in-progress:"]
+READY_MARKERS = [b"Net [Info]: MISSION_READY message: 1", b"Net [Info]: SetSquadMissionReady(1)"]
+
+def find_catch_up_offset(file_name, block_size=1 << 16, max_bytes=1 << 26):
+    # Reads backwards from EOF for the start of the latest mission line, None if there is none in the last max_bytes
+    overlap = max(len(marker) for marker in MISSION_MARKERS + READY_MARKERS) - 1
+    with open(file_name, 'rb') as read_obj:
+        position = read_obj.seek(0, os.SEEK_END)
+        limit = max(position - max_bytes, 0)
+        carry = b""  # Start of the block read before, for markers split across two blocks
+        ready_offset = None
+        while position > limit:
+            start = max(position - block_size, limit)
+            read_obj.seek(start)
+            data = read_obj.read(position - start) + carry
+            position = start
+
+            # A marker whose line started before this block keeps the whole block until its newline shows up
+            carry = data[:overlap]
+            found = max(data.rfind(marker) for marker in MISSION_MARKERS)
+            if found != -1:
+                line_start = data.rfind(b"\n", 0, found)
+                if line_start != -1 or start == 0:
+                    return start + line_start + 1
+                carry = data
+            elif ready_offset is None:
+                ready = max(data.rfind(marker) for marker in READY_MARKERS)
+                if ready != -1:
+                    line_start = data.rfind(b"\n", 0, ready)
+                    if line_start != -1 or start == 0:
+                        ready_offset = start + line_start + 1
+                    else:
+                        carry = data
+    # No mission line close enough, a MISSION_READY still restores the timer
+    return ready_offset
+
+def format_run(number, run):
+    splits = "  ".join(f"{stage}: {elapse}" for stage, elapse in run["splits"])
+    flags = (" [host]" if run["host"] else "") + (" [bugged]" if run["bugged"] else "")
+    return f"{number}. {run['stages']}  Time: {run['elapsed']}{flags}  {splits}"
+
+def replay(file_name, wanted_bounties, bounty_translation, block_size=1 << 20, window=None, max_age=None, rules=None):
+    # Headless pass over a whole EE.log, prints every run and the session summary
+    runs = []
+    parser = BountyParser(wanted_bounties, bounty_translation, on_run=runs.append, verbose=False, window=window, max_age=max_age, rules=rules)
+    started = time.perf_counter()
+    line_count = 0
+    for data in read_log_lines(file_name, block_size):
+        if not data:
+            continue
+        line_count += 1
+        parser.feed(data)
+    duration = time.perf_counter() - started
+
+    for number, run in enumerate(runs, 1):
+        print(format_run(number, run))
+    print(f"Bounties Completed: {parser.bountycycles} Best Time: {parser.best_elapsed} Avg. Time: {round(parser.mean, 3)} Best Rescue: {parser.best_stage_elapses[0]} Best Assassinate: {parser.best_stage_elapses[1]} Best Capture: {parser.best_stage_elapses[2]} Best Cache: {parser.best_stage_elapses[3]} Best Drone: {parser.best_stage_elapses[4]}")
+    for stage, stats in parser.stage_stats.items():
+        print(f"{stage}: {len(stats)} runs  Median: {round(stats.quantile(0.5), 3)}  Avg. Time: {round(stats.mean, 3)}")
+    print(f"Replayed {line_count} lines in {round(duration, 3)}s")
+    return parser, runs
+
+def chunk_offsets(file_name, chunk_size=1 << 26):
+    # (start, end) byte ranges of about chunk_size that begin and end on line boundaries
+    size = os.path.getsize(file_name)
+    bounds = [0]
+    with open(file_name, 'rb') as read_obj:
+        while bounds[-1] + chunk_size < size:
+            read_obj.seek(bounds[-1] + chunk_size)
+            read_obj.readline()
+            if read_obj.tell() >= size:
+                break
+            bounds.append(read_obj.tell())
+    return list(zip(bounds, bounds[1:] + [size])) if size else []
+
+def scan_chunk(file_name, start, end, slack=1 << 16):
+    # (offset, line) for every line in [start, end) the parser acts on: tracked lines, and the timestamped
+    # lines after a completion screen that decide whether the bounty was bugged, even past the chunk end
+    with open(file_name, 'rb') as read_obj:
+        try:
+            data, base = mmap.mmap(read_obj.fileno(), 0, access=mmap.ACCESS_READ), 0
+        except (ValueError, OSError):
+            # No mmap for this file, read the chunk and enough after it for a completion window
+            read_obj.seek(start)
+            data, base = read_obj.read(end - start + slack), start
+
+    def line_at(position):
+        line_start = data.rfind(b"\n", 0, position) + 1
+        line_end = data.find(b"\n", position)
+        if line_end == -1:
+            line_end = len(data)
+        return line_start, line_end, data[line_start:line_end].decode("utf-8", errors="ignore").strip()
+
+    try:
+        lines = {}
+        completions = []
+        for prefix in SCAN_MARKERS:
+            position = data.find(prefix, start - base, end - base)
+            while position != -1:
+                line_start, line_end, line = line_at(position)
+                event = classify_line(line)
+                if event is not None:
+                    lines[base + line_start] = line
+                    if event[0] == 'mission_complete':
+                        completions.append(line_end)
+                position = data.find(prefix, line_end, end - base)
+
+        for position in completions:
+            # count_complete_line gives up after 5 timestamped lines
+            counted = 0
+            while counted < 5 and position < len(data):
+                line_start, position, line = line_at(position + 1)
+                if has_timestamp(line):
+                    lines[base + line_start] = line
+                    counted += 1
+        return sorted(lines.items())
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+def analyze_corpus(files, wanted_bounties, bounty_translation, jobs=None, chunk_size=1 << 26, rules=None):
+    # Scans every file in chunks on a process pool, then stitches each file's lines back in order through one parser
+    files = list(dict.fromkeys(files))
+    started = time.perf_counter()
+    tasks = [(file_name, start, end) for file_name in files for start, end in chunk_offsets(file_name, chunk_size)]
+    with concurrent.futures.ProcessPoolExecutor(jobs) as pool:
+        results = list(pool.map(scan_chunk, *zip(*tasks))) if tasks else []
+    scanned = time.perf_counter()
+
+    lines_by_file = {file_name: {} for file_name in files}
+    for (file_name, start, end), lines in zip(tasks, results):
+        # A completion window can reach into the next chunk, those lines come back twice under the same offset
+        lines_by_file[file_name].update(lines)
+
+    runs = []
+    totals = RunningStats()
+    stage_totals = {}
+    best_elapsed = 0
+    for file_name in files:
+        file_runs = []
+        parser = BountyParser(wanted_bounties, bounty_translation, on_run=file_runs.append, verbose=False, rules=rules)
+        lines = lines_by_file[file_name]
+        for offset in sorted(lines):
+            parser.feed(lines[offset])
+        print(f"{file_name}: {parser.bountycycles} bounties  Best Time: {parser.best_elapsed}  Avg. Time: {round(parser.mean, 3)}")
+
+        runs.extend(file_runs)
+        for run in file_runs:
+            totals.add(run["elapsed"])
+        if parser.best_elapsed and (best_elapsed == 0 or parser.best_elapsed < best_elapsed):
+            best_elapsed = parser.best_elapsed
+        for stage, stats in parser.stage_stats.items():
+            merged = stage_totals.setdefault(stage, RunningStats())
+            for value in stats.sorted_values:
+                merged.add(value)
+    duration = time.perf_counter() - started
+
+    print(f"Bounties Completed: {len(runs)} Best Time: {best_elapsed} Avg. Time: {round(totals.mean, 3)}")
+    for stage, stats in sorted(stage_totals.items()):
+        print(f"{stage}: {len(stats)} runs  Best: {stats.sorted_values[0]}  10%: {round(stats.quantile(0.1), 3)}  Median: {round(stats.quantile(0.5), 3)}  "
+              f"90%: {round(stats.quantile(0.9), 3)}  Avg. Time: {round(stats.mean, 3)}")
+    mib = sum(end - start for _, start, end in tasks) / (1 << 20)
+    print(f"Analyzed {len(files)} files, {round(mib, 1)} MiB in {round(duration, 3)}s ({round(mib / max(scanned - started, 1e-9), 1)} MiB/s scanning)")
+    return runs
+
+class Metrics:
+    # Counters and histograms cheap enough for the parser thread, served by the metrics endpoint.
+    # The parser, Tk and HTTP threads share them, so every access holds the lock
+    buckets = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+    def __init__(self, error_interval=60, rate_window=10):
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}  # name -> [bucket counts..., +Inf count, sum]
+        self.error_interval = error_interval  # Seconds between two log lines for the same error
+        self.error_logged = {}  # key -> (monotonic time last logged, errors suppressed since)
+        self.rate_window = rate_window  # Seconds lines_per_second is averaged over
+        self.rate_samples = deque([(self.started, 0)])  # (monotonic, lines_read_total) about once a second, taken by the readers
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def count_lines(self, lines):
+        # lines_read_total plus the samples lines_per_second is computed from, so scrapes do not change it
+        now = time.monotonic()
+        with self.lock:
+            total = self.counters["lines_read_total"] = self.counters.get("lines_read_total", 0) + lines
+            if now - self.rate_samples[-1][0] >= 1:
+                self.rate_samples.append((now, total))
+                while now - self.rate_samples[0][0] > self.rate_window:
+                    self.rate_samples.popleft()
+
+    def observe(self, name, seconds):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = [0] * (len(self.buckets) + 2)
+            histogram[bisect.bisect_left(self.buckets, seconds)] += 1
+            histogram[-1] += seconds
+
+    def error(self, logger, key, message):
+        # Logs the first occurrence of an error, then at most once per error_interval with a count of the rest
+        now = time.monotonic()
+        with self.lock:
+            self.counters["errors_total_" + key] = self.counters.get("errors_total_" + key, 0) + 1
+            last, suppressed = self.error_logged.get(key, (None, 0))
+            if last is not None and now - last < self.error_interval:
+                self.error_logged[key] = (last, suppressed + 1)
+                return
+            self.error_logged[key] = (now, 0)
+        logger.error(message + (f" ({suppressed} similar errors suppressed)" if suppressed else ""))
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {name: list(histogram) for name, histogram in self.histograms.items()}
+            # Oldest sample within the window, or the newest one once reading stopped for longer
+            last, lines = next((sample for sample in self.rate_samples if now - sample[0] <= self.rate_window), self.rate_samples[-1])
+        lines_read = counters.get("lines_read_total", 0)
+        for name, histogram in histograms.items():
+            observations = sum(histogram[:-1])
+            histograms[name] = {"count": observations, "sum": histogram[-1],
+                                "buckets": dict(zip([str(bound) for bound in self.buckets] + ["+Inf"], histogram[:-1]))}
+        counters["lines_ignored_total"] = lines_read - counters.get("lines_classified_total", 0)
+        return {"uptime_seconds": round(now - self.started, 3),
+                "lines_per_second": round((lines_read - lines) / (now - last), 1) if now > last else 0,
+                "counters": counters, "histograms": histograms}
+
+    def prometheus(self):
+        snapshot = self.snapshot()
+        lines = [f"aya_uptime_seconds {snapshot['uptime_seconds']}", f"aya_lines_per_second {snapshot['lines_per_second']}"]
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"aya_{name} {value}")
+        for name, histogram in sorted(snapshot["histograms"].items()):
+            cumulative = 0
+            for bound, value in histogram["buckets"].items():
+                cumulative += value
+                lines.append(f'aya_{name}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"aya_{name}_sum {histogram['sum']}")
+            lines.append(f"aya_{name}_count {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1"):
+        # /metrics answers in Prometheus text format, /metrics.json as JSON
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = metrics.prometheus().encode(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = json.dumps(metrics.snapshot()).encode(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+metrics = Metrics()
+
+class LogTailer:
+    # Follows a growing log in blocks, surviving truncation and the file being recreated
+    def __init__(self, file_name, block_size=1 << 16, max_batch_bytes=1 << 22, from_end=True):
+        self.file_name = file_name
+        self.block_size = block_size
+        self.max_batch_bytes = max_batch_bytes  # Caps a single batch during log bursts
+        self.from_end = from_end  # Skip whatever the log already holds on the first open
+        self.inode = None
+        self.head = b""  # First bytes of the file, catches a recreated log that reused the inode
+        self.offset = 0  # Bytes read from the current file
+        self.buffer = bytearray()  # Holds the trailing partial line between reads
+        self.backlog = False  # The last batch hit max_batch_bytes, read again without waiting
+
+    @property
+    def position(self):
+        # Offset of the first byte that has not been returned as a line yet
+        return self.offset - len(self.buffer)
+
+    def start_at(self, offset):
+        # Continue from a byte offset of the current file instead of its end
+        self.reset(os.stat(self.file_name).st_ino, offset)
+
+    def snapshot(self):
+        return {"inode": self.inode, "head": self.head.hex(), "position": self.position}
+
+    def restore(self, state):
+        # Continue where a snapshot left off, False if the file was replaced or cut since
+        try:
+            stat = os.stat(self.file_name)
+            with open(self.file_name, 'rb') as read_obj:
+                head = read_obj.read(64)
+        except OSError:
+            return False
+        if stat.st_ino != state["inode"] or stat.st_size < state["position"] or not head.startswith(bytes.fromhex(state["head"])):
+            return False
+        self.reset(stat.st_ino, state["position"])
+        return True
+
+    def reset(self, inode, offset):
+        self.inode = inode
+        self.head = b""
+        self.offset = offset
+        self.buffer.clear()
+
+    def read_batch(self):
+        # Returns every complete line written since the last call
+        try:
+            stat = os.stat(self.file_name)
+        except FileNotFoundError:
+            return []
+
+        if self.inode is None:
+            self.reset(stat.st_ino, stat.st_size if self.from_end else 0)
+        elif stat.st_ino != self.inode:
+            # The game recreated EE.log, start over on the new file
+            self.reset(stat.st_ino, 0)
+        elif stat.st_size < self.offset:
+            # The log was truncated in place
+            self.reset(stat.st_ino, 0)
+
+        if stat.st_size == self.offset:
+            return []
+
+        # Not kept open between reads so the game can still replace the file
+        with open(self.file_name, 'rb') as read_obj:
+            head = read_obj.read(64)
+            if not head.startswith(self.head):
+                self.reset(stat.st_ino, 0)
+            self.head = head
+            read_obj.seek(self.offset)
+            read_bytes = 0
+            while read_bytes < self.max_batch_bytes:
+                block = read_obj.read(self.block_size)
+                if not block:
+                    break
+                self.buffer += block
+                read_bytes += len(block)
+            self.offset += read_bytes
+        self.backlog = read_bytes >= self.max_batch_bytes
+        metrics.count("bytes_tailed_total", read_bytes)
+
+        last_newline = self.buffer.rfind(b"\n")
+        if last_newline == -1:
+            return []
+        lines = self.buffer[:last_newline].decode("utf-8", errors="ignore").split("\n")
+        del self.buffer[:last_newline + 1]
+        return [line.strip() for line in lines]
+
+class LogWatcher:
+    # Blocks until a followed log changes: inotify on the log directories where available, otherwise
+    # stat polling that backs off from min_interval to max_interval while nothing is written
+    IN_MODIFY, IN_MOVED_TO, IN_CREATE = 0x2, 0x80, 0x100
+
+    def __init__(self, paths, min_interval=0.05, max_interval=1.0):
+        self.paths = list(paths)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.stats = {path: self.stat(path) for path in self.paths}
+        self.names = {}  # Watch descriptor -> file names in that directory we care about
+        self.fd = self.open_inotify()
+
+    def open_inotify(self):
+        # Watching the directory also catches the game recreating EE.log, None when inotify is not available
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError, TypeError):
+            return None
+        if fd < 0:
+            return None
+        for path in self.paths:
+            directory, name = os.path.split(os.path.abspath(path))
+            watch = libc.inotify_add_watch(fd, os.fsencode(directory), self.IN_MODIFY | self.IN_MOVED_TO | self.IN_CREATE)
+            if watch < 0:
+                os.close(fd)
+                self.names = {}
+                return None
+            self.names.setdefault(watch, set()).add(os.fsencode(name))
+        return fd
+
+    def stat(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def changed(self):
+        changed = False
+        for path in self.paths:
+            stat = self.stat(path)
+            if stat != self.stats[path]:
+                self.stats[path] = stat
+                changed = True
+        return changed
+
+    def read_events(self):
+        # True if any queued event is about a followed log rather than its neighbours
+        changed = False
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                watch, mask, cookie, length = struct.unpack_from("iIII", data, offset)
+                name = data[offset + 16:offset + 16 + length].rstrip(b"\0")
+                changed = changed or name in self.names.get(watch, ())
+                offset += 16 + length
+
+    def wait(self, timeout=None):
+        # True when a log changed, False when timeout seconds passed first
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if self.fd is not None:
+                readable, _, _ = select.select([self.fd], [], [], remaining)
+                if readable and self.read_events():
+                    return True
+            else:
+                time.sleep(self.interval if remaining is None else min(self.interval, remaining))
+                if self.changed():
+                    self.interval = self.min_interval
+                    return True
+                self.interval = min(self.interval * 2, self.max_interval)
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+# Every tracked message, as (message prefix, event kind, whole message must match)
+TRACKED_MESSAGES = [
+    ('Net [Info]: Set squad mission:', 'mission_host', False),
+    ('Script [Info]: ThemedSquadOverlay.lua: LoadLevelMsg received. Client joining mission in-progress:', 'mission_join', False),
+    ('Net [Info]: MatchingServiceWeb::ProcessSquadMessage received MISSION message', 'mission_client', False),
+    ('Script [Info]: EidolonMP.lua: EIDOLONMP: Going back to hub', 'abort', False),
+    ('Script [Info]: TopMenu.lua: Abort:', 'abort', False),
+    ('Net [Info]: MISSION_READY message: 1', 'mission_ready', True),
+    ('Net [Info]: SetSquadMissionReady(1)', 'mission_ready', True),
+    ('Sys [Info]: GiveItem Queuing resource load for Transmission:', 'transmission', False),
+    ('Sys [Info]: Created /Lotus/Interface/EidolonMissionComplete.swf', 'mission_complete', True),
+    ('Script [Info]: EidolonMissionComplete.lua: EidolonMissionComplete:: Got Reward:', 'reward', False),
+    ('Sys [Diag]: Current time:', 'log_start', False),
+]
+MISSION_KINDS = ('mission_host', 'mission_join', 'mission_client')
+
+# Tracked messages are told apart by their first characters, so noise costs one slice and one dict lookup
+PREFIX_KEY_LENGTH = 24
+SCAN_MARKERS = [prefix.encode() for prefix, kind, exact in TRACKED_MESSAGES]  # Searched for directly in raw chunks
+PREFIX_TABLE = {prefix[:PREFIX_KEY_LENGTH]: (prefix, kind, exact) for prefix, kind, exact in TRACKED_MESSAGES}
+assert len(PREFIX_TABLE) == len(TRACKED_MESSAGES)
+
+def classify_line(data):
+    # Returns (kind, timestamp, message) for tracked lines and None for everything else
+    split = data.find(" ")
+    if split == -1:
+        return None
+    entry = PREFIX_TABLE.get(data[split + 1:split + 1 + PREFIX_KEY_LENGTH])
+    if entry is None:
+        return None
+    prefix, kind, exact = entry
+    message = data[split + 1:]
+    if (message != prefix) if exact else not message.startswith(prefix):
+        return None
+    try:
+        timestamp = float(data[:split])
+    except ValueError:
+        timestamp = None  # Mission lines are still used without a timestamp
+    return kind, timestamp, message
+
+# "Current time: Sat Apr 01 12:00:00 2023 [UTC: Sat Apr 01 10:00:00 2023]" in the EE.log header
+LOG_START_PATTERN = re.compile(r"Current time: (.+?)(?: \[UTC: (.+?)\])?$")
+
+def parse_log_start(message, timestamp=None):
+    # Wall-clock time of log time 0 from the header line, None if it cannot be read
+    match = LOG_START_PATTERN.search(message)
+    if match is None:
+        return None
+    try:
+        if match.group(2):
+            started = calendar.timegm(time.strptime(match.group(2), "%a %b %d %H:%M:%S %Y"))
+        else:
+            started = time.mktime(time.strptime(match.group(1), "%a %b %d %H:%M:%S %Y"))
+    except ValueError:
+        return None
+    return started - (timestamp or 0)
+
+def read_log_start(file_name, limit=1 << 12):
+    # The header is among the first lines, for logs that are followed from their end
+    try:
+        with open(file_name, 'rb') as read_obj:
+            head = read_obj.read(limit)
+    except OSError:
+        return None
+    for line in head.decode("utf-8", errors="ignore").split("\n"):
+        event = classify_line(line.strip())
+        if event is not None and event[0] == 'log_start':
+            return parse_log_start(event[2], event[1])
+    return None
+
+def has_timestamp(data):
+    try:
+        float(data.split(None, 1)[0])
+    except (ValueError, IndexError):
+        return False
+    return True
+
+class RunningStats:
+    # IQR-filtered mean kept up to date per value instead of re-sorting the whole history
+    def __init__(self, window=None, max_age=None):
+        self.window = window  # Keep only the last N values
+        self.max_age = max_age  # Keep only values from the last N seconds, timestamps are wall-clock times
+        self.values = deque()  # (timestamp, value) in arrival order, for eviction
+        self.sorted_values = []
+        self.total = 0
+        self.mean = 0
+
+    def __len__(self):
+        return len(self.sorted_values)
+
+    def add(self, value, timestamp=0):
+        self.values.append((timestamp, value))
+        bisect.insort(self.sorted_values, value)
+        self.total += value
+
+        while (self.window is not None and len(self.values) > self.window) or \
+                (self.max_age is not None and timestamp - self.values[0][0] > self.max_age):
+            self.remove(self.values.popleft()[1])
+
+        self.mean = self.filtered_mean()
+
+    def remove(self, value):
+        del self.sorted_values[bisect.bisect_left(self.sorted_values, value)]
+        self.total -= value
+
+    def quantile(self, fraction):
+        return self.sorted_values[int(fraction * len(self.sorted_values))] if self.sorted_values else 0
+
+    def filtered_mean(self):
+        sorted_data = self.sorted_values
+        n = len(sorted_data)
+        if n < 4:  # Need at least 4 values to reliably compute IQR
+            return self.total / n if n else 0
+
+        Q1 = sorted_data[n // 4]  # 25th percentile
+        Q3 = sorted_data[3 * n // 4]  # 75th percentile
+        IQR = Q3 - Q1
+
+        # Outliers sit at both ends of the sorted values, so only those are summed
+        low = bisect.bisect_left(sorted_data, Q1 - 1.5 * IQR)
+        high = bisect.bisect_right(sorted_data, Q3 + 1.5 * IQR)
+        if high <= low:
+            return 0  # No valid data points to average
+        return (self.total - sum(sorted_data[:low]) - sum(sorted_data[high:])) / (high - low)
+
+class RunStore:
+    # SQLite history of every completed bounty, written in batches by its own thread
+    def __init__(self, path=None):
+        self.path = path or os.path.join(default_data_dir(), "history.sqlite3")
+        self.pending = queue.Queue()
+        self.thread = None
+        self.logger = logging.getLogger('Aya Bounty Tracker')
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self.connect() as connection:
+            connection.executescript('''
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY,
+                    log TEXT NOT NULL,
+                    finished_at REAL NOT NULL,
+                    day TEXT NOT NULL,
+                    tent TEXT NOT NULL,
+                    job_stages TEXT NOT NULL,
+                    stages TEXT NOT NULL,
+                    host INTEGER NOT NULL,
+                    bugged INTEGER NOT NULL,
+                    elapsed REAL NOT NULL,
+                    UNIQUE (log, finished_at, job_stages)
+                );
+                CREATE TABLE IF NOT EXISTS splits (
+                    run_id INTEGER NOT NULL REFERENCES runs(id),
+                    log TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    stage TEXT NOT NULL,
+                    elapsed REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS runs_log_stages_elapsed ON runs(log, job_stages, elapsed);
+                CREATE INDEX IF NOT EXISTS runs_log_day ON runs(log, day, elapsed);
+                CREATE INDEX IF NOT EXISTS splits_log_stage_elapsed ON splits(log, stage, elapsed);
+            ''')
+        connection.close()
+
+    def connect(self):
+        return sqlite3.connect(self.path)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.writer, daemon=True)
+        self.thread.start()
+
+    def add(self, run, log=None):
+        # Called from the parser thread, only queues the run. Dated by the log, or now if it had no header
+        self.pending.put((run.get("finished_at") or time.time(), log or DEFAULT_LOG_NAME, run))
+
+    def close(self):
+        # Flush whatever is still queued
+        self.pending.put(None)
+        if self.thread is not None:
+            self.thread.join()
+
+    def writer(self):
+        connection = self.connect()
+        while True:
+            batch = [self.pending.get()]
+            while True:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.write(connection, [item for item in batch if item is not None])
+            except Exception as e:
+                self.logger.error(f"Could not save {len(batch)} runs to history: {e}")
+            if None in batch:
+                connection.close()
+                return
+
+    def write(self, connection, batch):
+        # A run already in the history, from importing the same log twice, is skipped with its splits
+        with connection:
+            for finished_at, log, run in batch:
+                cursor = connection.execute(
+                    "INSERT OR IGNORE INTO runs (log, finished_at, day, tent, job_stages, stages, host, bugged, elapsed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (log, finished_at, time.strftime("%Y-%m-%d", time.localtime(finished_at)), run["tent"], "|".join(run["job_stages"]),
+                     run["stages"], int(run["host"]), int(run["bugged"]), run["elapsed"]))
+                if not cursor.rowcount:
+                    continue
+                connection.executemany("INSERT INTO splits (run_id, log, position, stage, elapsed) VALUES (?, ?, ?, ?, ?)",
+                                       [(cursor.lastrowid, log, position, stage, elapse) for position, (stage, elapse) in enumerate(run["splits"])])
+
+    def query(self, sql, parameters=()):
+        connection = self.connect()
+        try:
+            return connection.execute(sql, parameters).fetchall()
+        finally:
+            connection.close()
+
+    def logs(self):
+        return [row[0] for row in self.query("SELECT DISTINCT log FROM runs ORDER BY log")]
+
+    def best_by_stages(self, log=DEFAULT_LOG_NAME):
+        # Personal best for every stage combination, answered from runs_log_stages_elapsed
+        return self.query("SELECT job_stages, stages, MIN(elapsed), COUNT(*) FROM runs WHERE log = ? AND bugged = 0 GROUP BY job_stages ORDER BY MIN(elapsed)", (log,))
+
+    def daily_averages(self, log=DEFAULT_LOG_NAME):
+        return self.query("SELECT day, COUNT(*), AVG(elapsed), MIN(elapsed) FROM runs WHERE log = ? AND bugged = 0 GROUP BY day ORDER BY day", (log,))
+
+    def best_splits(self, log=DEFAULT_LOG_NAME):
+        return dict(self.query("SELECT stage, MIN(elapsed) FROM splits WHERE log = ? GROUP BY stage", (log,)))
+
+    def best_elapsed(self, log=DEFAULT_LOG_NAME):
+        # Bugged runs count like they do for the live parser
+        return self.query("SELECT MIN(elapsed) FROM runs WHERE log = ?", (log,))[0][0] or 0
+
+    def session_runs(self, log, since):
+        # (finished_at, elapsed, splits) of every run of the log that finished since, oldest first
+        runs = self.query("SELECT id, finished_at, elapsed FROM runs WHERE log = ? AND finished_at >= ? ORDER BY finished_at", (log, since))
+        splits = {}
+        if runs:
+            for run_id, stage, elapse in self.query("SELECT run_id, stage, elapsed FROM splits WHERE log = ? AND run_id >= ? ORDER BY run_id, position",
+                                                    (log, min(run[0] for run in runs))):
+                splits.setdefault(run_id, []).append((stage, elapse))
+        return [(finished_at, elapsed, splits.get(run_id, [])) for run_id, finished_at, elapsed in runs]
+
+def print_history(store):
+    for log in store.logs():
+        print(f"{log}:")
+        print("Best times by stage combination:")
+        for job_stages, stages, best, count in store.best_by_stages(log):
+            print(f"  {best}  ({count} runs)  {stages}")
+        print("Daily averages:")
+        for day, count, average, best in store.daily_averages(log):
+            print(f"  {day}  {count} runs  Avg. Time: {round(average, 3)}  Best Time: {best}")
+
+class StageSequence:
+    # Stage pattern such as ["Cache", "*", "Capture"], run as a DFA built lazily one transition at a time
+    # A token is a stage path or translated name, "?" is any one stage and "*" any number of stages
+    def __init__(self, pattern):
+        self.pattern = list(pattern)
+        self.start = self.closure([0])
+        self.transitions = {}  # (states, stage names) -> next states
+
+    def closure(self, states):
+        # "*" may also match no stage at all
+        result = set()
+        for state in states:
+            result.add(state)
+            while state < len(self.pattern) and self.pattern[state] == "*":
+                state += 1
+                result.add(state)
+        return frozenset(result)
+
+    def step(self, states, names):
+        key = (states, names)
+        next_states = self.transitions.get(key)
+        if next_states is None:
+            moved = set()
+            for state in states:
+                if state == len(self.pattern):
+                    continue
+                token = self.pattern[state]
+                if token == "*":
+                    moved.add(state)
+                elif token == "?" or token in names:
+                    moved.add(state + 1)
+            next_states = self.transitions[key] = self.closure(moved)
+        return next_states
+
+    def matches(self, stage_names):
+        states = self.start
+        for names in stage_names:
+            states = self.step(states, names)
+            if not states:
+                return False
+        return len(self.pattern) in states
+
+class BountyRule:
+    # One compiled rule, every condition it sets must hold for it to match
+    KEYS = ("name", "verdict", "tent", "tier", "stages", "any_stage", "min_count", "sequence")
+
+    def __init__(self, spec):
+        # Values are checked here, a rule that only fails on a mission line would break every mission
+        def as_set(key, value_type, noun):
+            value = spec.get(key)
+            if value is None:
+                return None
+            values = value if isinstance(value, list) else [value]
+            if not all(isinstance(item, value_type) and not isinstance(item, bool) for item in values):
+                raise ValueError(f"Rule {self.name}: {key} must be a {noun} or a list of {noun}s")
+            return frozenset(values)
+
+        if not isinstance(spec, dict):
+            raise ValueError(f"Rule {spec!r} is not an object")
+        self.name = spec.get("name") or json.dumps(spec, sort_keys=True)
+        # A misspelled condition would otherwise leave a rule that matches everything
+        unknown = sorted(set(spec) - set(self.KEYS))
+        if unknown:
+            raise ValueError(f"Rule {self.name}: unknown key {', '.join(unknown)}")
+        if spec.get("verdict", "wanted") not in ("wanted", "unwanted"):
+            raise ValueError(f"Rule {self.name}: verdict must be wanted or unwanted")
+        self.wanted = spec.get("verdict", "wanted") == "wanted"
+        self.tents = as_set("tent", str, "name")  # TentA, TentB, TentC or Konzu
+        self.tiers = as_set("tier", int, "number")
+        self.only_stages = as_set("stages", str, "stage name")  # Every stage of the bounty is one of these
+        self.any_stages = as_set("any_stage", str, "stage name")  # At least one stage is one of these
+        self.min_count = spec.get("min_count", {})  # Stage -> how often it has to appear at least
+        if not isinstance(self.min_count, dict) or \
+                not all(isinstance(count, int) and not isinstance(count, bool) for count in self.min_count.values()):
+            raise ValueError(f"Rule {self.name}: min_count must map stage names to counts")
+        sequence = spec.get("sequence")
+        if sequence is not None and (not isinstance(sequence, list) or not all(isinstance(token, str) for token in sequence)):
+            raise ValueError(f"Rule {self.name}: sequence must be a list of stage names")
+        self.sequence = StageSequence(sequence) if sequence is not None else None
+
+    def matches(self, tent, tier, stage_names):
+        if self.tents is not None and tent not in self.tents:
+            return False
+        if self.tiers is not None and tier not in self.tiers:
+            return False
+        if self.only_stages is not None and not all(not names.isdisjoint(self.only_stages) for names in stage_names):
+            return False
+        if self.any_stages is not None and all(names.isdisjoint(self.any_stages) for names in stage_names):
+            return False
+        if self.min_count:
+            counts = {}
+            for names in stage_names:
+                for name in names:
+                    if name in self.min_count:
+                        counts[name] = counts.get(name, 0) + 1
+            if any(counts.get(name, 0) < count for name, count in self.min_count.items()):
+                return False
+        if self.sequence is not None and not self.sequence.matches(stage_names):
+            return False
+        return True
+
+class BountyRules:
+    # Wanted/unwanted rules from a JSON file, compiled once and reloaded when the file changes
+    #   {"rules": [{"name": "...", "verdict": "wanted" | "unwanted", "tent": ..., "tier": ..., "stages": [...],
+    #               "any_stage": [...], "min_count": {"Cache": 2}, "sequence": [...]}, ...],
+    #    "default": "wanted list" | "wanted" | "unwanted"}
+    # or just the list of rules. The first matching rule decides, "wanted list" falls back to the downloaded wanted bounties
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.compiled = ([], "wanted list")  # (rules, default), replaced as a whole
+        self.listeners = []  # Called with this rule set after a reload
+        self.logger = logging.getLogger('Aya Bounty Tracker')
+
+    def load(self):
+        self.mtime = os.stat(self.path).st_mtime
+        with open(self.path, 'r', encoding="utf-8") as read_obj:
+            spec = json.load(read_obj)
+        if isinstance(spec, list):
+            spec = {"rules": spec}
+        if not isinstance(spec, dict) or set(spec) - {"rules", "default"}:
+            raise ValueError("expected a list of rules or an object with rules and default")
+        default = spec.get("default", "wanted list")
+        if default not in ("wanted list", "wanted", "unwanted"):
+            raise ValueError("default must be wanted list, wanted or unwanted")
+        self.compiled = ([BountyRule(rule) for rule in spec.get("rules", [])], default)
+        return self
+
+    def reload_if_changed(self):
+        try:
+            if os.stat(self.path).st_mtime == self.mtime:
+                return False
+            self.load()
+        except Exception as e:
+            # Keep the rules that worked until the file is fixed, a deleted file is retried every check
+            metrics.error(self.logger, "rules", f"Could not load bounty rules {self.path}: {e}")
+            self.mtime = None if not os.path.exists(self.path) else os.stat(self.path).st_mtime
+            return False
+        for listener in self.listeners:
+            listener(self)
+        return True
+
+    def verdict(self, tent, tier, stage_names, in_wanted_list):
+        # Returns (wanted, name of the rule that decided)
+        rules, default = self.compiled
+        for rule in rules:
+            if rule.matches(tent, tier, stage_names):
+                return rule.wanted, rule.name
+        if default == "wanted list":
+            return in_wanted_list, default
+        return default == "wanted", "default"
+
+class Event:
+    # Compact record of something the parser learned, `fields` are the slots exported after the timestamp
+    __slots__ = ("timestamp",)
+    kind = "event"
+    fields = ()
+
+    def __init__(self, timestamp, *values):
+        self.timestamp = timestamp
+        for name, value in zip(self.fields, values):
+            setattr(self, name, value)
+
+    def to_dict(self):
+        record = {"kind": self.kind, "timestamp": self.timestamp}
+        for name in self.fields:
+            record[name] = getattr(self, name)
+        return record
+
+class MissionSet(Event):
+    __slots__ = fields = ("tent", "stages", "wanted", "rule", "host")
+    kind = "mission_set"
+
+class RunStart(Event):
+    __slots__ = fields = ("tent", "stages", "host")
+    kind = "run_start"
+
+class StageStart(Event):
+    __slots__ = fields = ("stage",)
+    kind = "stage_start"
+
+class StageEnd(Event):
+    __slots__ = fields = ("stage", "elapse")
+    kind = "stage_end"
+
+class Reward(Event):
+    __slots__ = fields = ("count", "needed")
+    kind = "reward"
+
+class RunComplete(Event):
+    __slots__ = fields = ("tent", "stages", "host", "elapsed", "splits", "bugged")
+    kind = "run_complete"
+
+class Abort(Event):
+    __slots__ = ()
+    kind = "abort"
+
+class Fail(Event):
+    __slots__ = fields = ("stage",)
+    kind = "fail"
+
+class Bugged(Event):
+    __slots__ = ()
+    kind = "bugged"
+
+class Resumed(Event):
+    # Sent once after a startup catch-up instead of replaying the events of the tail
+    __slots__ = fields = ("tent", "stages", "wanted", "rule", "host", "running", "start", "stage", "stage_running", "stage_start")
+    kind = "resumed"
+
+class EventStream:
+    # Batches events into JSON lines for stdout and for clients of a local socket
+    def __init__(self, output=None):
+        self.output = output  # Text file to write to, None to only serve the socket
+        self.closed = False  # The reader of output went away, e.g. --events - | head
+        self.pending = []
+        self.clients = []
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger('Aya Bounty Tracker')
+
+    def publish(self, log, event):
+        record = event.to_dict()
+        record["log"] = log
+        self.pending.append(json.dumps(record, separators=(",", ":")))
+
+    def flush(self):
+        # One write per parsed batch instead of one per event
+        if not self.pending:
+            return
+        data = "\n".join(self.pending) + "\n"
+        self.pending = []
+        if self.output is not None and not self.closed:
+            try:
+                self.output.write(data)
+                self.output.flush()
+            except OSError:
+                self.closed = True
+        encoded = data.encode("utf-8")
+        with self.lock:
+            for client in list(self.clients):
+                try:
+                    client.sendall(encoded)
+                except OSError:
+                    # Gone or too slow to keep up
+                    self.clients.remove(client)
+                    client.close()
+
+    def serve(self, port, host="127.0.0.1"):
+        # Every client that connects gets the events from then on
+        server = socket.create_server((host, port))
+
+        def accept():
+            while True:
+                client, address = server.accept()
+                client.settimeout(1)
+                with self.lock:
+                    self.clients.append(client)
+                self.logger.info(f"Event stream client connected from {address[0]}:{address[1]}")
+
+        threading.Thread(target=accept, daemon=True).start()
+        return server
+
+class BountyParser:
+    # Tracks bounty state from EE.log lines, independent of any window
+    # Attributes a checkpoint carries over, the rest is configuration or rebuilt on restore
+    STATE = ("bountycycles", "start", "end", "elapsed", "best_elapsed", "start_bool", "stage_bool", "good_bounty", "counts", "stages_int",
+             "stage_start", "stage_end", "stage_elapse", "elapsed_prev", "stage", "stages_string", "tent", "job_stages", "matched_rule",
+             "splits", "best_stage_elapses", "complete", "bugged", "run_bugged", "host", "line_num")
+
+    def __init__(self, wanted_bounties, bounty_translation, on_update=None, on_run=None, verbose=True, window=None, max_age=None, rules=None):
+        self.bounty_tables = (wanted_bounties, bounty_translation)
+        self.rules = rules  # BountyRules, or None to only use the wanted bounties
+        self.mission_cache = functools.lru_cache(maxsize=256)(self.decode_mission)
+        self.job_cache = functools.lru_cache(maxsize=256)(self.render_job)
+        self.on_update = on_update  # Called with (text, text_color) when the mission label changes
+        self.on_run = on_run  # Called with a run record after each completed bounty
+        self.subscribers = []  # (kinds, callback) pairs, kinds is None for every event
+        self.verbose = verbose
 
         # Initialize variables
-        self.first_run = True
-        self.last_line_index = self.last_access = self.bountycycles = 0
+        self.bountycycles = 0
         self.start = self.end = self.elapsed = self.best_elapsed = 0
         self.start_bool = self.stage_bool = self.parse_success = self.good_bounty = False
-        self.start_time = self.counts = self.stages_int = 0
-        self.stage_time = self.stage_start = self.stage_end = self.stage_elapse = self.elapsed_prev = 0
+        self.counts = self.stages_int = 0
+        self.clock_anchor = (0, time.monotonic())  # (log timestamp, monotonic time it was read at)
+        self.log_started = None  # Wall-clock time of log time 0, from the EE.log header
+        self.stage_start = self.stage_end = self.stage_elapse = self.elapsed_prev = 0
         self.stages_start = ["ResIntro", "AssIntro", "CapIntro", "CacheIntro", "HijackIntro", "FinalIntro"]
         self.stages_translate_start = {"ResIntro":"Rescue", "AssIntro":"Assassinate", "CapIntro":"Capture", "CacheIntro":"Cache", "HijackIntro":"Drone", "FinalIntro":"Capture"}
         self.stages_translate_end = {"ResWin":"Rescue", "AssWin":"Assassinate", "CapWin":"Capture", "CacheWin":"Cache", "HijackWin":"Drone", "FinalWin":"Capture"}
         self.stages_end = ["ResWin", "AssWin", "CapWin", "CacheWin", "HijackWin", "FinalWin"]
+        self.transmission_pattern = re.compile("|".join(["BountyFail"] + self.stages_start + self.stages_end))
         self.tent_mapping = {"TentA": "Tent A: ", "TentB": "Tent B: ", "TentC": "Tent C: "}
         self.stage_to_index = {"Rescue": 0,"Assassinate": 1,"Capture": 2,"Cache": 3,"Drone": 4}
-        self.dataset = []  # Store inliers
+        self.window = window
+        self.max_age = max_age
+        self.stats = RunningStats(window, max_age)  # Completed bounty times
+        self.stage_stats = {}  # Stage name -> RunningStats of its times
         self.mean = 0  # Running average
         self.stage = ""
+        self.stages_string = ""
+        self.tent = "Konzu"
+        self.job_stages = []
+        self.matched_rule = None
+        self.splits = []  # (stage, elapse) pairs of the current run
         self.best_stage_elapses = [0,0,0,0,0]
-        self.complete = self.bugged = False
+        self.complete = self.bugged = self.run_bugged = False
         self.host = False
         self.line_num = 0
 
+        self.logger = logging.getLogger('Aya Bounty Tracker')
+
+    def set_bounty_tables(self, wanted_bounties, bounty_translation):
+        # Swapped as one tuple so a line is never checked against half old, half new tables
+        self.bounty_tables = (wanted_bounties, bounty_translation)
+        self.reset_mission_caches()
+
+    def set_rules(self, rules):
+        self.rules = rules
+        self.reset_mission_caches()
+
+    def reset_mission_caches(self):
+        # Fresh caches rather than cache_clear, a decode still running on the old tables can only fill the old ones
+        self.mission_cache = functools.lru_cache(maxsize=256)(self.decode_mission)
+        self.job_cache = functools.lru_cache(maxsize=256)(self.render_job)
+
+    def subscribe(self, callback, kinds=None):
+        # Calls callback with every Event whose kind is in kinds
+        self.subscribers.append((None if kinds is None else frozenset(kinds), callback))
+
+    def emit(self, event_type, timestamp, *values):
+        # Records are only built when someone listens
+        if not self.subscribers:
+            return
+        event = event_type(timestamp, *values)
+        for kinds, callback in self.subscribers:
+            if kinds is None or event.kind in kinds:
+                callback(event)
+
+    def update_overlay(self, text, text_color):
+        if self.on_update is not None:
+            self.on_update(text, text_color)
+
+    def feed(self, data):
+        # Runs a single stripped line through the state machine, returns True if state changed
+        self.parse_success = False
+        event = classify_line(data)
+        if event is None:
+            # Untracked lines only matter while waiting for the rewards of a completed bounty
+            if self.complete and has_timestamp(data):
+                self.count_complete_line()
+            return False
+
+        metrics.count("lines_classified_total")
+        kind, timestamp, message = event
+        if timestamp is not None:
+            self.clock_anchor = (timestamp, time.monotonic())
+        if kind == 'log_start':
+            self.log_started = parse_log_start(message, timestamp)
+        if kind in MISSION_KINDS:
+            self.parse_mission(kind, message, data)
+        if timestamp is not None:
+            self.elapse(kind, timestamp, message, data)
+        return self.parse_success
+
+    def snapshot(self):
+        # JSON-ready copy of the run state and bests, taken between lines. Small and constant in size,
+        # the averages are rebuilt from the run history instead
+        state = {name: getattr(self, name) for name in self.STATE}
+        state["log_time"] = self.clock_anchor[0]
+        return state
+
+    def restore(self, state, history=()):
+        # history holds (finished_at, elapsed, splits) of the runs the averages were built from
+        for name in self.STATE:
+            if name in state:
+                setattr(self, name, state[name])
+        self.splits = [tuple(split) for split in self.splits]
+        self.clock_anchor = (state.get("log_time", 0), time.monotonic())
+        self.stats = RunningStats(self.window, self.max_age)
+        self.stage_stats = {}
+        for finished_at, elapsed, splits in history:
+            self.stats.add(elapsed, finished_at)
+            for stage, elapse in splits:
+                if stage not in self.stage_stats:
+                    self.stage_stats[stage] = RunningStats(self.window, self.max_age)
+                self.stage_stats[stage].add(elapse, finished_at)
+        self.mean = self.stats.mean
+
+    def mission_label(self):
+        # Overlay text and color for the current mission
+        tent = self.tent_mapping.get(self.tent, "Konzu:  ")
+        label = tent + self.stages_string if self.rules is None else f"{tent}{self.stages_string} ({self.matched_rule})"
+        return label, "green" if self.good_bounty else "red"
+
+    def restore_bests(self, best_elapsed, best_splits):
+        # Seed the personal bests from an earlier session
+        self.best_elapsed = best_elapsed
+        for stage, index in self.stage_to_index.items():
+            self.best_stage_elapses[index] = best_splits.get(stage, 0)
+
+    def wall_time(self, timestamp):
+        # Log time starts over with every game restart, so --window-age evicts by wall-clock time. Now if the log had no header
+        return self.log_started + timestamp if self.log_started is not None else time.time()
+
+    def log_now(self):
+        # Current log time, extrapolated from the last tracked line instead of counting sleeps
+        timestamp, monotonic = self.clock_anchor
+        return timestamp + time.monotonic() - monotonic
+
+    def run_time(self):
+        return max(self.log_now() - self.start, 0) if self.start_bool else self.elapsed
+
+    def stage_run_time(self):
+        return max(self.log_now() - self.stage_start, 0) if self.stage_bool else self.stage_elapse
+
+    def calculate_running_average(self, value, timestamp=0):
+        self.stats.add(value, timestamp)
+        self.mean = self.stats.mean
+
+    def parse_mission(self, kind, message, data):
+        try:
+            if kind == 'mission_host':
+                self.host = True
+            elif kind == 'mission_client':
+                self.host = False
+
+            # Extract JSON data
+            json_start_index = message.find("{")
+            json_end_index = message.rfind("}") + 1
+            if json_start_index == -1 or json_end_index == 0:
+                return
+            payload = message[json_start_index:json_end_index]
+
+            # Load the JSON, the same few payloads repeat all session
+            try:
+                mission = self.mission_cache(payload)
+            except ValueError as e:
+                metrics.error(self.logger, "String1", f"Please Report this String1: {e} | Line: {data}")
+                return
+
+            # Validate the JSON keys
+            if mission is None:
+                return
+
+            self.parse_success = True
+            self.stages_int, self.job_stages, stages_string, self.tent, tent, wanted, self.matched_rule = mission
+            self.stages_string = stages_string
+            label = self.mission_label()[0]
+            self.emit(MissionSet, self.clock_anchor[0], self.tent, stages_string, wanted, self.matched_rule, self.host)
+            if not wanted:
+                # Update overlay with translation in red
+                self.update_overlay(label, "red")
+                self.good_bounty = False
+                return
+            # Valid stages found, update overlay with translation in green
+            self.update_overlay(label, "green")
+            if self.good_bounty == False:
+                if self.verbose:
+                    print(stages_string)
+                self.good_bounty = True
+
+        except Exception as e:
+            metrics.error(self.logger, "String4", f"Please Report this String4: {e} | Line: {data}")
+
+    def decode_mission(self, payload):
+        # Raw mission JSON to the rendered mission, None if it is not a bounty
+        decode_started = time.perf_counter()
+        json_data = json.loads(payload)
+        metrics.observe("json_decode_seconds", time.perf_counter() - decode_started)
+        if not all(key in json_data for key in ['jobTier', 'jobStages', 'job']):
+            return None
+        return self.job_cache(json_data['jobId'], json_data['jobTier'], tuple(json_data['jobStages']))
+
+    def render_job(self, job_id, job_tier, job_stages):
+        # Translated stages, tent and verdict, shared by every payload of the same job
+        wanted_bounties, bounty_translation = self.bounty_tables
+        stages = [bounty_translation.get(stage, stage) for stage in job_stages]
+        if any(stage not in bounty_translation for stage in job_stages):
+            count = 0
+            for stage in stages:
+                index = stage.rfind("/") + 1
+                stages[count] = stages[count][index:].replace("Dynamic", "").replace("Narmer", "")
+                count += 1
+
+        stages_string = " -> ".join(stages)
+        tent = next((key for key in self.tent_mapping if key in job_id), "Konzu")
+        tent_label = self.tent_mapping.get(tent, "Konzu:  ")
+        wanted = not any(stage not in wanted_bounties for stage in job_stages)
+        rule = None
+        if self.rules is not None:
+            # Rules can name a stage by its path or by its translation
+            stage_names = [frozenset((stage, name)) for stage, name in zip(job_stages, stages)]
+            wanted, rule = self.rules.verdict(tent, job_tier, stage_names, wanted)
+        return len(job_stages), job_stages, stages_string, tent, tent_label, wanted, rule
+
+    def count_complete_line(self):
+        # Rewards that do not show up within 5 lines of the completion screen mean a bugged bounty
+        self.line_num += 1
+        if self.line_num == 5:
+            self.complete = False
+            self.line_num = 0
+            self.bugged = self.run_bugged = True
+            self.emit(Bugged, self.clock_anchor[0])
+
+    def elapse(self, kind, timestamp, message, data):
+        try:
+            # Resets timers if aborted
+            if kind == 'abort':
+                self.elapsed = self.stage_elapse = 0
+                self.start_bool = self.stage_bool = False
+                self.counts = 0
+                self.parse_success = True
+                self.complete = self.bugged = False
+                self.emit(Abort, timestamp)
+
+            # Starts timer
+            elif kind == 'mission_ready':
+                self.start = timestamp
+                self.start_bool = True
+                self.counts = 0
+                self.splits = []
+                self.parse_success = True
+                self.complete = self.bugged = self.run_bugged = False
+                self.emit(RunStart, timestamp, self.tent, self.stages_string, self.host)
+
+            # Checks Transmissions
+            elif kind == 'transmission':
+                match = self.transmission_pattern.search(message)
+                transmission = match.group() if match else ""
+
+                # Resets if bounty fails
+                if transmission == "BountyFail":
+                    self.elapsed = self.stage_elapse = 0
+                    self.start_bool = self.stage_bool = False
+                    self.counts = 0
+                    self.complete = self.bugged = False
+                    self.emit(Fail, timestamp, self.stage)
+
+                # Stage Start
+                elif transmission in self.stages_translate_start:
+                    self.stage_start = timestamp
+                    self.stage_bool = True
+                    self.stage = self.stages_translate_start[transmission]
+                    self.emit(StageStart, timestamp, self.stage)
+
+                # Stage End
+                elif transmission in self.stages_translate_end:
+                    self.stage_end = timestamp
+                    if self.stage_start != 0:
+                        self.stage_elapse = self.stage_end - self.stage_start
+                    self.stage = self.stages_translate_end[transmission]
+                    if self.stage in self.stage_to_index:
+                        index = self.stage_to_index[self.stage]
+                        # Check the conditions for updating the best_stage_elapses
+                        if (self.best_stage_elapses[index] == 0) or (self.stage_elapse <= self.best_stage_elapses[index]):
+                            if self.stage_elapse >= 0:
+                                self.best_stage_elapses[index] = round(self.stage_elapse, 3)
+                    if self.start_bool and self.stage_elapse > 0:
+                        self.splits.append((self.stage, round(self.stage_elapse, 3)))
+                    self.emit(StageEnd, timestamp, self.stage, round(self.stage_elapse, 3))
+                    self.stage_start = 0
+                    self.stage_bool = False
+                self.parse_success = True
+
+            if self.complete == True:
+                self.count_complete_line()
+
+            # Checks if stage is completed
+            if kind == 'mission_complete':
+                self.complete = True
+                self.parse_success = True
+                self.line_num = 0
+                self.bugged = False
+
+            # Increments after each reward
+            if kind == 'reward':
+                self.counts += 1
+                self.complete = self.bugged = False
+                self.emit(Reward, timestamp, self.counts, self.stages_int)
+                if self.counts == self.stages_int:
+                    self.end = timestamp
+                    self.start_bool = False
+                    self.bountycycles += 1
+                    #Calculate elapsed time if conditions are met
+                    if self.end > self.start:
+                        self.elapsed = self.end - self.start
+                    if (self.best_elapsed == 0) or (self.elapsed <= self.best_elapsed):
+                        self.best_elapsed = round(self.elapsed, 3)
+                    if self.elapsed != self.elapsed_prev and self.elapsed != 0:
+                        finished = self.wall_time(self.end)
+                        self.calculate_running_average(self.elapsed, finished)
+                        # Stage times count once their run completes, the same runs restore() rebuilds them from
+                        for stage, elapse in self.splits:
+                            if stage not in self.stage_stats:
+                                self.stage_stats[stage] = RunningStats(self.window, self.max_age)
+                            self.stage_stats[stage].add(elapse, finished)
+                        self.elapsed_prev = self.elapsed
+                        self.emit(RunComplete, timestamp, self.tent, self.stages_string, self.host, round(self.elapsed, 3), list(self.splits), self.run_bugged)
+                        if self.on_run is not None:
+                            finished_at = None if self.log_started is None else round(self.log_started + self.end, 3)
+                            self.on_run({"tent": self.tent, "job_stages": self.job_stages, "stages": self.stages_string, "host": self.host, "start": self.start,
+                                         "elapsed": round(self.elapsed, 3), "splits": self.splits, "bugged": self.run_bugged, "finished_at": finished_at})
+                        if self.verbose:
+                            print(f"Best Time: {self.best_elapsed} Avg. Time: {round(self.mean, 3)} Best Rescue: {self.best_stage_elapses[0]} Best Assassinate: {self.best_stage_elapses[1]} Best Capture: {self.best_stage_elapses[2]} Best Cache: {self.best_stage_elapses[3]} Best Drone: {self.best_stage_elapses[4]}")
+                self.parse_success = True
+
+        except Exception as e:
+            metrics.error(self.logger, "String5", f"Please Report this String5: {e} | Line: {data}")
+
+class LogSession:
+    # One followed EE.log with its own tailer, parser state and stats
+    def __init__(self, name, path, parser):
+        self.name = name
+        self.path = path
+        self.tailer = LogTailer(path)
+        self.parser = parser
+        parser.log_started = read_log_start(path)  # The tailer starts past the header
+        self.since = time.time()  # When the averages of this session started, kept across resumes
+
+    def catch_up(self):
+        # Restores a bounty still in progress from the tail since the latest mission, True if there was one
+        try:
+            offset = find_catch_up_offset(self.path)
+        except FileNotFoundError:
+            return False
+        if offset is None:
+            return False
+
+        # A scratch parser tells first whether that bounty already ended before this session
+        parser = self.parser
+        scratch = BountyParser(*parser.bounty_tables, verbose=False, rules=parser.rules)
+        kinds = set()
+        scratch.subscribe(lambda event: kinds.add(event.kind))
+        tailer = LogTailer(self.path)
+        tailer.start_at(offset)
+        while True:
+            batch = tailer.read_batch()
+            if not batch:
+                break
+            for data in batch:
+                if data:
+                    scratch.feed(data)
+        if not scratch.start_bool and kinds & {"run_start", "run_complete", "abort", "fail"}:
+            self.tailer.start_at(tailer.position)
+            return False
+
+        # Nothing in the tail finished, so nothing in it may be counted, printed or emitted again
+        on_run, parser.on_run = parser.on_run, None
+        verbose, parser.verbose = parser.verbose, False
+        subscribers, parser.subscribers = parser.subscribers, []
+        self.tailer.start_at(offset)
+        self.replay_tail()
+        parser.on_run, parser.verbose, parser.subscribers = on_run, verbose, subscribers
+        parser.emit(Resumed, parser.clock_anchor[0], parser.tent, parser.stages_string, parser.good_bounty, parser.matched_rule, parser.host,
+                    parser.start_bool, parser.start, parser.stage, parser.stage_bool, parser.stage_start)
+        return True
+
+    def resume(self, state, load_history=None):
+        # Picks up at a checkpoint, runs that finished while the tracker was closed are recorded as usual.
+        # load_history(since) returns the runs recorded since the checkpointed session began
+        if not self.tailer.restore(state["tailer"]):
+            return False
+        self.since = state.get("since", self.since)
+        self.parser.restore(state["parser"], load_history(self.since) if load_history is not None else ())
+        self.replay_tail()
+        return True
+
+    def replay_tail(self):
+        # Parses everything from the tailer position to EOF at once
+        last_line = ""
+        while True:
+            batch = self.tailer.read_batch()
+            if not batch:
+                break
+            for data in batch:
+                if data:
+                    self.parser.feed(data)
+                    last_line = data
+
+        # The game wrote the last line just now, anchor the timers to it
+        timestamp = last_line.split(" ", 1)[0]
+        try:
+            self.parser.clock_anchor = (float(timestamp), time.monotonic())
+        except ValueError:
+            pass
+
+class Checkpoint:
+    # Parser and tailer state of every followed log in one JSON file, replaced atomically after events
+    def __init__(self, path=None, interval=60):
+        self.path = path or os.path.join(default_data_dir(), "checkpoint.json")
+        self.interval = interval  # Seconds between saves while only the offsets move
+        self.dirty = False  # A parser event happened since the last save
+        self.saved = time.monotonic()
+        self.logger = logging.getLogger('Aya Bounty Tracker')
+
+    def mark(self, event):
+        self.dirty = True
+
+    def load(self):
+        # Log name -> saved state, empty when there is no usable checkpoint
+        try:
+            with open(self.path, 'r', encoding="utf-8") as read_obj:
+                return json.load(read_obj)
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            self.logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return {}
+
+    def save(self, sessions):
+        state = {session.name: {"since": session.since, "tailer": session.tailer.snapshot(), "parser": session.parser.snapshot()}
+                 for session in sessions if session.tailer.inode is not None}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding="utf-8") as write_obj:
+            json.dump(state, write_obj)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+        self.saved = time.monotonic()
+
+    def save_if_due(self, sessions):
+        if self.dirty or time.monotonic() - self.saved > self.interval:
+            try:
+                self.save(sessions)
+            except OSError as e:
+                metrics.error(self.logger, "checkpoint", f"Could not save checkpoint {self.path}: {e}")
+
+def parse_log_arguments(values):
+    # "NAME=PATH" or just "PATH" for every --log, the default EE.log when none are given.
+    # The name keys the run history and the checkpoint, so an unnamed log goes by its absolute path
+    if not values:
+        return [(DEFAULT_LOG_NAME, default_log_path())]
+    logs = []
+    for value in values:
+        name, separator, path = value.partition("=")
+        logs.append((name, path) if separator and not os.path.exists(value) else (os.path.abspath(value), value))
+    return logs
+
+def positive_float(value):
+    # argparse type of --refresh-rate, which the parser thread divides by
+    number = float(value)
+    if not 0 < number < float("inf"):
+        raise argparse.ArgumentTypeError(f"must be a positive number, got {value!r}")
+    return number
+
+def event_target(value):
+    # argparse type of --events, "-" or a port number
+    if value == "-":
+        return value
+    try:
+        port = int(value)
+    except ValueError:
+        port = 0
+    if not 0 < port < 65536:
+        raise argparse.ArgumentTypeError(f"expected - or a port number, got {value!r}")
+    return port
+
+def stream_events(logs, stream, window=None, max_age=None, rules_path=None):
+    # Follows the logs without the overlay and hands every parser event to the stream, until its output is closed
+    logger = logging.getLogger('Aya Bounty Tracker')
+    bounty_data = BountyData()
+    bounty_tables = bounty_data.load()
+    rules = BountyRules(rules_path).load() if rules_path else None
+    rules_checked = time.monotonic()
+    sessions = []
+    for name, path in logs:
+        parser = BountyParser(*bounty_tables, verbose=False, window=window, max_age=max_age, rules=rules)
+        parser.subscribe(functools.partial(stream.publish, name))
+        bounty_data.listeners.append(parser.set_bounty_tables)
+        if rules is not None:
+            rules.listeners.append(parser.set_rules)
+        sessions.append(LogSession(name, path, parser))
+    bounty_data.refresh_in_background()
+    watcher = LogWatcher(path for name, path in logs)
+
+    # Consumers start with the bounty in progress
+    for session in sessions:
+        session.catch_up()
+    stream.flush()
+    while not stream.closed:
+        try:
+            for session in sessions:
+                batch = session.tailer.read_batch()
+                metrics.count_lines(len(batch))
+                for data in batch:
+                    if data:
+                        session.parser.feed(data)
+            stream.flush()
+            if rules is not None and time.monotonic() - rules_checked > 2:
+                rules_checked = time.monotonic()
+                rules.reload_if_changed()
+            if not any(session.tailer.backlog for session in sessions):
+                watcher.wait(None if rules is None else 2)
+        except Exception as e:
+            metrics.error(logger, "EE.log2", f"Error reading EE.log2 {e}")
+            time.sleep(1)
+
+class OverlayApp:
+    def __init__(self, window=None, max_age=None, frame_interval=50, refresh_rate=10, history_path=None, logs=None, rules_path=None, checkpoint_path=None):
+        # Imported here so --replay, --analyze and --events run without Tk installed
+        import tkinter as tk
+
+        # Initialize main window
+        self.root = tk.Tk()
+        self.root.overrideredirect(True)  
+        self.root.attributes("-topmost", True) 
+        self.root.geometry("10x10")
+        self.root.configure(bg='black')
+        self.root.attributes("-alpha", 0.5)
+
+        # Initialize variables
+        self.first_run = True
+        self.render_queue = queue.Queue()  # State snapshots from the worker threads
+        self.frame_interval = frame_interval  # Milliseconds between renders while snapshots come in
+        self.max_drain_interval = 500  # Milliseconds the idle drain backs off to
+        self.drain_interval = frame_interval
+        self.refresh_rate = refresh_rate  # Timer updates per second while a bounty runs
+        self.hover_timer = None  # Pending check_position while the overlay is hidden
+        self.label1_text, self.label1_color = "", "white"
+        self.label1_shown = (self.label1_text, self.label1_color)
+        logs = logs or [(DEFAULT_LOG_NAME, default_log_path())]
+
         # Flags to track the visibility state
         self.overlay_visible = True
 
         # Create labels
         self.label1 = tk.Label(self.root, text="", fg="white", bg="black",
                               font=('Times New Roman', 15, ''))
-        self.label2 = tk.Label(self.root, text="", fg="white", bg="black",
-                              font=('Times New Roman', 15, ''))
         self.label1.pack(fill="both", expand=True)
-        self.label2.pack(fill="both", expand=True)
+
+        # One stats row per followed log
+        self.stat_labels = []
+        for _ in logs:
+            label = tk.Label(self.root, text="", fg="white", bg="black",
+                             font=('Times New Roman', 15, ''))
+            label.pack(fill="both", expand=True)
+            self.stat_labels.append(label)
+        self.stat_texts = [""] * len(logs)
 
         #Close the overlay when clicked
         self.root.bind("<Enter>", self.on_enter)
@@ -80,34 +1693,60 @@ class OverlayApp:
         # self.offset_y = 0
 
         # # Configure window position
-        self.width = max(self.label1.winfo_reqwidth(), self.label2.winfo_reqwidth()) + 2  # Add padding
-        height = 50    # Fixed height
+        self.width = max(label.winfo_reqwidth() for label in [self.label1] + self.stat_labels) + 2  # Add padding
+        self.height = 25 * (len(logs) + 1)    # Fixed height per row
         self.screen_width = self.root.winfo_screenwidth()
         self.x = (self.screen_width / 2) - (self.width / 2)
         self.y = 0
         self.center = self.x + (self.width / 2)
-        self.root.geometry(f'{self.width}x{height}+{int(self.x)}+{int(self.y)}')
+        self.root.geometry(f'{self.width}x{self.height}+{int(self.x)}+{int(self.y)}')
 
         # Set up logger
         self.logger = setup_custom_logger('Aya Bounty Tracker')
 
-        self.path = os.path.join(os.getenv('LOCALAPPDATA'), "Warframe", "EE.log")
+        # Restore personal bests from the run history
+        self.store = RunStore(history_path)
+
+        # Start from cached bounty data and refresh it in the background, all parsers share the same tables
+        self.bounty_data = BountyData()
+        bounty_tables = self.bounty_data.load()
+
+        # Optional bounty rules, checked for changes while running
+        self.rules = BountyRules(rules_path).load() if rules_path else None
+        self.rules_checked = time.monotonic()
 
-        # Fetching bounty data
-        wanted_bounties = requests.get("https://gist.githubusercontent.com/ManInTheWallPog/d9cc2c83379a74ef57f0407b0d84d9b2/raw/").content
-        bounty_translation = requests.get("https://gist.githubusercontent.com/ManInTheWallPog/02dfd3efdd62ed5b7061dd2e62324fa3/raw/").content
-        self.wanted_bounties = json.loads(wanted_bounties.decode('utf-8'))
-        self.bounty_translation = json.loads(bounty_translation.decode('utf-8'))
+        # Saved after every batch with parser events, so a restart resumes mid-run
+        self.checkpoint = Checkpoint(checkpoint_path)
+
+        self.sessions = []
+        for index, (name, path) in enumerate(logs):
+            parser = BountyParser(*bounty_tables, on_update=functools.partial(self.update_overlay, index),
+                                  on_run=functools.partial(self.store.add, log=name), window=window, max_age=max_age, rules=self.rules)
+            # Every account keeps its own bests
+            parser.restore_bests(self.store.best_elapsed(name), self.store.best_splits(name))
+            parser.subscribe(self.checkpoint.mark)
+            self.bounty_data.listeners.append(parser.set_bounty_tables)
+            if self.rules is not None:
+                self.rules.listeners.append(parser.set_rules)
+            self.sessions.append(LogSession(name, path, parser))
 
     def on_enter(self, event):
         if self.overlay_visible:
             self.root.withdraw()
             self.overlay_visible = False  # Update the flag
+        self.arm_hover_check()
 
     def on_leave(self, event):
-        self.check_position()
+        self.arm_hover_check()
+
+    def arm_hover_check(self):
+        # A hidden overlay gets no mouse events, so poll for the mouse leaving, with at most one timer pending
+        if not self.overlay_visible and self.hover_timer is None:
+            self.hover_timer = self.root.after(100, self.check_position)
 
     def check_position(self):
+        metrics.count("wakeups_total")
+        self.hover_timer = None
         # Check if the mouse is outside the geometry of the overlay
         x1 = self.root.winfo_x()
         y1 = self.root.winfo_y()
@@ -120,8 +1759,8 @@ class OverlayApp:
                 self.root.deiconify()  # Show overlay if it's currently hidden
                 self.overlay_visible = True
 
-        # Check position again after a short delay
-        self.root.after(100, self.check_position)
+        # Check position again after a short delay while still hidden
+        self.arm_hover_check()
 
     # def start_drag(self, event):
     #     self.dragging = True
@@ -138,314 +1777,232 @@ class OverlayApp:
     #         self.center = self.x + (self.width/2)
     #         self.root.geometry(f"+{int(self.x)}+{int(self.y)}")
 
-    def get_last_n_lines(self, file_name):
-        current_last_index = self.last_line_index
-
-        with open(file_name, 'r', encoding="utf-8", errors='ignore') as read_obj:
-            # Move the cursor to the end of the file
-            read_obj.seek(0, os.SEEK_END)
-            # Get the current position of pointer i.e eof
-            last_line = read_obj.tell()
-            if current_last_index == 0:
-                self.last_line_index = last_line
-                return  # No lines to yield if the index is 0
-            
-            if last_line < current_last_index:
-                return  # Return early if there are no new lines
-
-            while True:
-                read_obj.seek(self.last_line_index)
-                line = read_obj.readline()
-                if line.endswith('\n'):
-                    # Yield each line as it is read
-                    current_last_index += len(line)
-                    self.last_line_index = current_last_index
-                    yield line.strip()
-                else:
-                    time.sleep(0.1)
-                    self.last_line_index = current_last_index  # Update index
-
-    def update_overlay(self, text, text_color):
-        # Update label if necessary
-        if text != 'same' and text_color != 'same':
-            self.label1.config(text=text, fg=text_color)
+    def update_overlay(self, index, text, text_color, read_at=None):
+        # Safe to call from any thread, it touches no Tk state. The Tk thread picks the snapshot up in drain_overlay
+        p = self.sessions[index].parser
+        best_stage = None
+        if p.stage in p.stage_to_index:
+            best_stage = p.best_stage_elapses[p.stage_to_index[p.stage]]
+        alert = p.bugged or (p.host == True and p.bountycycles % 42 == 0 and p.bountycycles != 0)
+        self.render_queue.put((index, text, text_color, alert, read_at, p.bountycycles, p.run_time(),
+                               p.best_elapsed, p.mean, p.stage_run_time(), p.stage, best_stage))
 
-        if self.bugged or (self.host == True and self.bountycycles % 42 == 0 and self.bountycycles != 0):
-            self.label1.config(fg='red')
+    def drain_overlay(self):
+        # Coalesce everything published since the last frame into a single render
+        metrics.count("wakeups_total")
+        latest = {}  # Newest snapshot of every log that published
+        snapshots = 0
+        read_at = None  # When the oldest log line in this frame was read
+        while True:
+            try:
+                snapshot = self.render_queue.get_nowait()
+            except queue.Empty:
+                break
+            snapshots += 1
+            index, text, text_color, alert, line_read_at = snapshot[:5]
+            if text != 'same' and text_color != 'same':
+                if len(self.sessions) > 1:
+                    text = f"{self.sessions[index].name}: {text}"
+                self.label1_text, self.label1_color = text, text_color
+            if alert:
+                self.label1_color = 'red'
+            if read_at is None:
+                read_at = line_read_at
+            latest[index] = snapshot
 
-        best_stages = ""
-        if self.stage in self.stage_to_index:
-            index = self.stage_to_index[self.stage]
-            best_stages = str(datetime.timedelta(seconds=self.best_stage_elapses[index]))
+        if latest:
+            self.render_overlay(latest.values())
+            metrics.count("renders_total")
+            metrics.count("frames_dropped_total", snapshots - len(latest))
+            if read_at is not None:
+                metrics.observe("read_to_render_seconds", time.perf_counter() - read_at)
 
-        # Convert the times to a readable format
-        finish = str(datetime.timedelta(seconds=self.start_time if self.start_bool else self.elapsed))
-        best = str(datetime.timedelta(seconds=self.best_elapsed))
-        stage = str(datetime.timedelta(seconds=self.stage_time if self.stage_bool else self.stage_elapse))
-        mean = str(datetime.timedelta(seconds=self.mean))
+        # Only the Tk thread may arm Tk timers, so it polls the queue: every frame while snapshots come in,
+        # backing off between bounties the way LogWatcher backs off its stat polling
+        self.drain_interval = self.frame_interval if snapshots else min(self.drain_interval * 2, self.max_drain_interval)
+        self.root.after(self.drain_interval, self.drain_overlay)
 
+    def render_overlay(self, snapshots):
         # Ensure millisecond precision
-        def append_milliseconds(time_str):
+        def format_time(seconds):
+            time_str = str(datetime.timedelta(seconds=seconds))
             return time_str[:11] if '.' in time_str else time_str + ".000"
 
-        # Directly process each variable
-        finish, best, mean, stage, best_stages = (
-            append_milliseconds(var) for var in [finish, best, mean, stage, best_stages])
+        # Only touch the labels that actually changed
+        if self.label1_shown != (self.label1_text, self.label1_color):
+            self.label1_shown = (self.label1_text, self.label1_color)
+            self.label1.config(text=self.label1_text, fg=self.label1_color)
 
-        # Update label with formatted string
-        if best_stages == ".000":
-            text=f" Bounties Completed: {self.bountycycles}  Timer: {finish}  Best Time: {best}  Avg. Time: {mean} "
-        else:
-            text=f" Bounties Completed: {self.bountycycles}  Timer: {finish}  Best Time: {best}  Avg. Time: {mean}  Stage Timer: {stage}  Best {self.stage}: {best_stages} "
-        self.label2.config(text=text)
+        for snapshot in snapshots:
+            index = snapshot[0]
+            bountycycles, timer, best_elapsed, mean, stage_timer, stage_name, best_stage = snapshot[5:]
+            name = f" {self.sessions[index].name}:" if len(self.sessions) > 1 else ""
 
-        # Update window size
-        self.root.update_idletasks()
-        self.width = max(self.label1.winfo_reqwidth(), self.label2.winfo_reqwidth()) + 2  # Add padding
-        height = 50    # Fixed height
+            # Update label with formatted string
+            if best_stage is None:
+                text=f"{name} Bounties Completed: {bountycycles}  Timer: {format_time(timer)}  Best Time: {format_time(best_elapsed)}  Avg. Time: {format_time(mean)} "
+            else:
+                text=f"{name} Bounties Completed: {bountycycles}  Timer: {format_time(timer)}  Best Time: {format_time(best_elapsed)}  Avg. Time: {format_time(mean)}  Stage Timer: {format_time(stage_timer)}  Best {stage_name}: {format_time(best_stage)} "
+            if text != self.stat_texts[index]:
+                self.stat_texts[index] = text
+                self.stat_labels[index].config(text=text)
+
+        # Update window size only when the text needs a different width
+        width = max(label.winfo_reqwidth() for label in [self.label1] + self.stat_labels) + 2  # Add padding
+        if width == self.width:
+            return
+        self.width = width
 
         # Calculate coordinates for the window
         self.x = self.center - (self.width / 2)
 
-        self.root.geometry(f'{self.width}x{height}+{int(self.x)}+{int(self.y)}')
-
-    def calculate_running_average(self, value):
-        # Add new value to the data
-        self.dataset.append(value)
-
-        if len(self.dataset) < 4:  # Need at least 4 values to reliably compute IQR
-            self.mean = sum(self.dataset) / len(self.dataset) if self.dataset else 0
-            return
-        
-        sorted_data = sorted(self.dataset)
-        n = len(sorted_data)
-        
-        Q1 = sorted_data[n // 4]  # 25th percentile
-        Q3 = sorted_data[3 * n // 4]  # 75th percentile
-        IQR = Q3 - Q1
-        
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
-        
-        # Filter data points that are not outliers
-        filtered_data = [x for x in self.dataset if lower_bound <= x <= upper_bound]
-        
-        # Update mean
-        if filtered_data:
-            self.mean = sum(filtered_data) / len(filtered_data)
-        else:
-            self.mean = 0  # No valid data points to average
+        self.root.geometry(f'{self.width}x{self.height}+{int(self.x)}+{int(self.y)}')
 
     def run(self):
-        threading.Thread(target=self.clock).start()
+        self.bounty_data.refresh_in_background()
+        self.store.start()
         threading.Thread(target=self.data_parser).start()
-        self.update_overlay("starting...", "white")
+        for index in range(len(self.sessions)):
+            self.update_overlay(index, "starting...", "white")
+        self.root.after(0, self.drain_overlay)
         self.root.mainloop()
 
-    def clock(self):
-        while True:
-            if self.start_bool:
-                self.update_overlay("same", "same")
-                time.sleep(1)
-                self.start_time += 1
-                if self.stage_bool:
-                    self.stage_time += 1
-            else:
-                time.sleep(0.5)
-
     def data_parser(self):
+        # A single loop tails every followed log, ticks the running timers and reloads the rules,
+        # sleeping until a log changes or the next of those is due
+        interval = 1 / self.refresh_rate
+        watcher = LogWatcher(session.path for session in self.sessions)
+        next_tick = 0
+        next_rules_check = time.monotonic() + 2
         while True:
             try:
-                time.sleep(0.1)
-                self.parse_success = False
+                metrics.count("wakeups_total")
                 if self.first_run == True:
                         self.first_run = False
-                        self.update_overlay("Waiting for bounty", "white")
-                for data in self.get_last_n_lines(self.path):
-                    if not data:
-                        continue
-                    self.parse_lines(data)
-                    self.elapse(data)
-                    if self.parse_success:
-                        self.update_overlay("same", "same")
+                        checkpoint = self.checkpoint.load()
+                        # The mission label is shared, so no log may say it waits after another restored its mission
+                        for index in range(len(self.sessions)):
+                            self.update_overlay(index, "Waiting for bounty", "white")
+                        for index, session in enumerate(self.sessions):
+                            self.resume(index, session, checkpoint.get(session.name))
+                backlog = False
+                for index, session in enumerate(self.sessions):
+                    backlog = self.parse_session(index, session) or backlog
+                self.checkpoint.save_if_due(self.sessions)
+
+                now = time.monotonic()
+                deadlines = []
+                if self.rules is not None:
+                    if now >= next_rules_check:
+                        next_rules_check = now + 2
+                        self.rules.reload_if_changed()
+                    deadlines.append(next_rules_check)
+                running = [index for index, session in enumerate(self.sessions) if session.parser.start_bool]
+                if running:
+                    if now >= next_tick:
+                        for index in running:
+                            self.update_overlay(index, "same", "same")
+                        # Wake when the first running timer reaches its next tick
+                        next_tick = now + interval - self.sessions[running[0]].parser.run_time() % interval
+                    deadlines.append(next_tick)
+                else:
+                    next_tick = 0  # Nothing to count while idle, tick as soon as a bounty starts
+                if not backlog:
+                    watcher.wait(max(min(deadlines) - now, 0) if deadlines else None)
             except Exception as e:
-                self.logger.info(f"Error reading EE.log2 {e}")
+                metrics.error(self.logger, "EE.log2", f"Error reading EE.log2 {e}")
                 time.sleep(1)
 
-    def parse_lines(self, data):
-        for line in range(1):
-            line_data = data.split()
-            if not line_data:
-                continue
-            try:
-                #Extract key line info and check conditions
-                line_key = ' '.join(line_data[1:-1])
-                if line_key not in (
-                    'Net [Info]: Set squad mission:',
-                    'Script [Info]: ThemedSquadOverlay.lua: LoadLevelMsg received. Client joining mission in-progress:',
-                    'Net [Info]: MatchingServiceWeb::ProcessSquadMessage received MISSION message'):
-                    continue
-                
-                data_string = ' '.join(line_data[-1:])  # Capture the last part after splitting
-
-                if 'Net [Info]: Set squad mission:' in line_key:
-                    self.host = True
-                elif 'Net [Info]: MatchingServiceWeb::ProcessSquadMessage received MISSION message' in line_key:
-                    self.host = False
-
-                # Extract JSON data
-                json_start_index = data_string.find("{")
-                json_end_index = data_string.rfind("}") + 1
-                if any(index == -1 for index in [json_start_index, json_end_index]):
-                    continue
-                json_data = data_string[json_start_index:json_end_index].replace(
-                    'null', 'None'.replace('true', 'True').replace('false', 'False').replace("True", '"True"'))
-
-                # Load the JSON
-                try:
-                    json_data = json.loads(json_data)
-                except Exception as e:
-                    self.logger.error(f"Please Report this String1: {e} | Line: {line_data}")
-                    continue
+    def resume(self, index, session, state):
+        # From the checkpoint when it still matches the log, otherwise from the latest mission in it
+        if state is not None and session.resume(state, functools.partial(self.store.session_runs, session.name)):
+            if session.parser.stages_string:
+                self.update_overlay(index, *session.parser.mission_label())
+            self.update_overlay(index, "same", "same")
+        elif session.catch_up():
+            self.update_overlay(index, "same", "same")
 
-                # Validate the JSON keys
-                if not all(key in json_data for key in ['jobTier', 'jobStages', 'job']):
-                    continue
-
-                self.parse_success = True
-                self.stages_int = len(json_data['jobStages'])
-                stages = [self.bounty_translation.get(stage, stage) for stage in json_data['jobStages']]
-                if any(stage not in self.bounty_translation for stage in json_data['jobStages']):
-                    count = 0
-                    for stage in stages:
-                        index = stage.rfind("/") + 1
-                        stages[count] = stages[count][index:].replace("Dynamic", "").replace("Narmer", "")
-                        count += 1
-                
-                stages_string = " -> ".join(stages)
-                tent = next((label for key, label in self.tent_mapping.items() if key in json_data['jobId']), "Konzu:  ")
-                if any(stage not in self.wanted_bounties for stage in json_data['jobStages']):
-                    # Update overlay with translation in red
-                    self.update_overlay(tent + stages_string, "red")
-                    self.good_bounty = False
-                    continue
-                # Valid stages found, update overlay with translation in green
-                self.update_overlay(tent + stages_string, "green")
-                if self.good_bounty == False:
-                    print(stages_string)
-                    self.good_bounty = True
-
-            except Exception as e:
-                self.logger.error(f"Please Report this String4: {e} | Line: {line_data}")
+    def parse_session(self, index, session):
+        # True while the tailer still has a backlog to read
+        batch = session.tailer.read_batch()
+        if not batch:
+            return session.tailer.backlog
+        read_at = time.perf_counter()
+        metrics.count_lines(len(batch))
+        parser = session.parser
+        for data in batch:
+            if not data:
                 continue
-                
-    def elapse(self, data):
-        for line in range(1):
-            line_data = data.split()
-            if not line_data:
-                continue  # Skip empty lines
-            
-            # Attempt to convert the first part of the line to float
-            try:
-                timestamp = float(line_data[0])  # Extract the timestamp
-            except ValueError:
-                continue  # Skip to the next line if conversion fails
+            if parser.feed(data):
+                self.update_overlay(index, "same", "same", read_at)
+        metrics.observe("parse_batch_seconds", time.perf_counter() - read_at)
+        return session.tailer.backlog
 
-            message = ' '.join(line_data[1:])
+def main():
+    arg_parser = argparse.ArgumentParser(description="Aya Bounty Tracker")
+    arg_parser.add_argument("--replay", metavar="EE_LOG", help="analyze a whole EE.log without opening the overlay")
+    arg_parser.add_argument("--analyze", nargs="+", metavar="EE_LOG", help="bests, averages and stage times over archived EE.log files, scanned in parallel")
+    arg_parser.add_argument("--jobs", type=int, metavar="N", help="processes for --analyze (default one per CPU)")
+    arg_parser.add_argument("--chunk-size", type=int, default=64, metavar="MIB", help="bytes per --analyze work item in MiB (default 64)")
+    arg_parser.add_argument("--log", action="append", metavar="[NAME=]PATH", help="EE.log to follow, repeat for several accounts, named by its absolute path unless NAME= is given (default %%LOCALAPPDATA%%/Warframe/EE.log)")
+    arg_parser.add_argument("--window", type=int, help="average only the last N bounties")
+    arg_parser.add_argument("--window-age", type=float, metavar="SECONDS", help="average only bounties from the last N seconds")
+    arg_parser.add_argument("--history", metavar="DB", help="run history database (default in %%LOCALAPPDATA%%/AyaBountyTracker)")
+    arg_parser.add_argument("--history-log", default=DEFAULT_LOG_NAME, metavar="NAME", help="--log name the runs of --replay/--analyze are imported under (default %(default)s)")
+    arg_parser.add_argument("--history-report", action="store_true", help="print best times and daily averages from the run history")
+    arg_parser.add_argument("--checkpoint", metavar="FILE", help="tracker state saved for resuming after a restart (default in %%LOCALAPPDATA%%/AyaBountyTracker)")
+    arg_parser.add_argument("--rules", metavar="RULES_JSON", help="wanted/unwanted bounty rules, reloaded when the file changes")
+    arg_parser.add_argument("--metrics-port", type=int, metavar="PORT", help="serve /metrics and /metrics.json on 127.0.0.1:PORT")
+    arg_parser.add_argument("--events", type=event_target, metavar="TARGET", help="stream bounty events as JSON lines without the overlay, TARGET is - for stdout or a local port")
+    arg_parser.add_argument("--refresh-rate", type=positive_float, default=10, metavar="HZ", help="timer updates per second (default 10)")
+    args = arg_parser.parse_args()
 
-            try:
-                # Resets timers if aborted
-                if any(substring in message for substring in (
-                    'Script [Info]: EidolonMP.lua: EIDOLONMP: Going back to hub',
-                    'Script [Info]: TopMenu.lua: Abort:')):
-                    self.start_time = self.elapsed = self.stage_time = self.stage_elapse = 0
-                    self.start_bool = self.stage_bool = False
-                    self.counts = 0
-                    self.parse_success = True
-                    self.complete = self.bugged = False
+    if args.history_report:
+        print_history(RunStore(args.history))
+        return
 
-                # Starts timer
-                elif message in (
-                    'Net [Info]: MISSION_READY message: 1',
-                    'Net [Info]: SetSquadMissionReady(1)'):
-                    self.start = timestamp
-                    self.start_time = 0
-                    self.start_bool = True
-                    self.counts = 0
-                    self.parse_success = True
-                    self.complete = self.bugged = False
+    if args.replay or args.analyze:
+        setup_custom_logger('Aya Bounty Tracker')
+        bounty_data = BountyData()
+        bounty_data.load()
+        bounty_data.refresh()
+        wanted_bounties, bounty_translation = bounty_data.tables
+        rules = BountyRules(args.rules).load() if args.rules else None
+        if args.analyze:
+            runs = analyze_corpus(args.analyze, wanted_bounties, bounty_translation, args.jobs, args.chunk_size << 20, rules)
+        else:
+            parser, runs = replay(args.replay, wanted_bounties, bounty_translation, window=args.window, max_age=args.window_age, rules=rules)
+        if args.history:
+            # Import the replayed runs into the given history
+            store = RunStore(args.history)
+            store.start()
+            for run in runs:
+                store.add(run, args.history_log)
+            store.close()
+        return
 
-                # Checks Transmissions
-                elif 'Sys [Info]: GiveItem Queuing resource load for Transmission:' in message:
-                    # Resets if bounty fails
-                    if "BountyFail" in message:
-                        self.start_time = self.elapsed = self.stage_time = self.stage_elapse = 0
-                        self.start_bool = self.stage_bool = False
-                        self.counts = 0
-                        self.complete = self.bugged = False
-                    
-                    # Stage Start
-                    elif any(stage in message for stage in self.stages_start):
-                        self.stage_start = timestamp
-                        self.stage_time = 0
-                        self.stage_bool = True
-                        stage = next((stage for stage in self.stages_start if stage in message), "")
-                        self.stage = self.stages_translate_start[stage]
-                    
-                    # Stage End
-                    elif any(stage in message for stage in self.stages_end):
-                        self.stage_end = timestamp
-                        if self.stage_start != 0:
-                            self.stage_elapse = self.stage_end - self.stage_start
-                        stage = next((stage for stage in self.stages_end if stage in message), "")
-                        self.stage = self.stages_translate_end[stage]
-                        if self.stage in self.stage_to_index:
-                            index = self.stage_to_index[self.stage]
-                            # Check the conditions for updating the best_stage_elapses
-                            if (self.best_stage_elapses[index] == 0) or (self.stage_elapse <= self.best_stage_elapses[index]):
-                                if self.stage_elapse >= 0:
-                                    self.best_stage_elapses[index] = round(self.stage_elapse, 3)
-                        self.stage_start = 0
-                        self.stage_bool = False
-                    self.parse_success = True
-                
-                if self.complete == True:
-                    self.line_num += 1
-                    #print(message)
-                    if self.line_num == 5:
-                        self.complete = False
-                        self.line_num = 0
-                        self.bugged = True
-                
-                # Checks if stage is completed
-                if 'Sys [Info]: Created /Lotus/Interface/EidolonMissionComplete.swf' == message:
-                    self.complete = True
-                    self.parse_success = True
-                    self.line_num = 0
-                    self.bugged = False
-                
-                # Increments after each reward
-                if 'Script [Info]: EidolonMissionComplete.lua: EidolonMissionComplete:: Got Reward:' in message: 
-                    self.counts += 1
-                    self.complete = self.bugged = False
-                    if self.counts == self.stages_int:
-                        self.end = timestamp
-                        self.start_bool = False
-                        self.bountycycles += 1
-                        #Calculate elapsed time if conditions are met
-                        if self.end > self.start:
-                            self.elapsed = self.end - self.start
-                        if (self.best_elapsed == 0) or (self.elapsed <= self.best_elapsed):
-                            self.best_elapsed = round(self.elapsed, 3)
-                        if self.elapsed != self.elapsed_prev and self.elapsed != 0:
-                            self.calculate_running_average(self.elapsed)    
-                            self.elapsed_prev = self.elapsed
-                            print(f"Best Time: {self.best_elapsed} Avg. Time: {round(self.mean, 3)} Best Rescue: {self.best_stage_elapses[0]} Best Assassinate: {self.best_stage_elapses[1]} Best Capture: {self.best_stage_elapses[2]} Best Cache: {self.best_stage_elapses[3]} Best Drone: {self.best_stage_elapses[4]}")
-                    self.parse_success = True
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
 
-            except Exception as e:
-                self.logger.error(f"Please Report this String5: {e} | Line: {line_data}")
+    if args.events:
+        setup_custom_logger('Aya Bounty Tracker')
+        if args.events == "-":
+            stream = EventStream(sys.stdout)
+        else:
+            stream = EventStream()
+            stream.serve(args.events)
+        try:
+            stream_events(parse_log_arguments(args.log), stream, args.window, args.window_age, args.rules)
+        except KeyboardInterrupt:
+            pass
+        if stream.closed:
+            # Python flushes stdout again on exit, which would only raise BrokenPipeError once more
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
 
-if __name__ == "__main__":
-    app = OverlayApp()
+    app = OverlayApp(args.window, args.window_age, refresh_rate=args.refresh_rate, history_path=args.history, logs=parse_log_arguments(args.log), rules_path=args.rules,
+                     checkpoint_path=args.checkpoint)
     app.run()
+
+if __name__ == "__main__":
+    main()
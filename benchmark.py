@@ -0,0 +1,279 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from BountyChecker import BountyParser, LogTailer, LogWatcher, analyze_corpus, chunk_offsets, classify_line, read_log_lines, replay
+
+NOISE = [
+    "Sys [Info]: Loaded /Lotus/Levels/PlainsOfEidolon/Forest{n}.level",
+    "Game [Info]: Sentient tree {n} spawned",
+    "Net [Info]: Replication count by type: {n}",
+    "Script [Info]: HudRedux.lua: Updating marker {n}",
+    "Sys [Info]: AUDIO: Streaming sound bank {n}",
+    "Net [Info]: Set squad mission ready state for player {n}",
+    "Script [Info]: EidolonMP.lua: EIDOLONMP: Spawning teralyst wave {n}",
+    "Sys [Info]: GiveItem Queuing resource load for ambient effect {n}",
+]
+STAGES = [("ResIntro", "ResWin"), ("AssIntro", "AssWin"), ("CapIntro", "CapWin"), ("CacheIntro", "CacheWin"), ("HijackIntro", "HijackWin")]
+TRANSMISSION = "Sys [Info]: GiveItem Queuing resource load for Transmission: /Lotus/Sounds/Dialog/EidolonBounties/Konzu{}"
+COMPLETE = b"Sys [Info]: Created /Lotus/Interface/EidolonMissionComplete.swf"
+HEADER_TIME = "%a %b %d %H:%M:%S %Y"
+REWARD = "Script [Info]: EidolonMissionComplete.lua: EidolonMissionComplete:: Got Reward: /Lotus/StoreItems/Types/Items/Eidolon/Reward{}"
+
+class LogGenerator:
+    # Deterministic EE.log traffic: noise at `rate` lines per log second with bounties mixed in
+    def __init__(self, seed=1, rate=40, abort_chance=0.05, fail_chance=0.03, bugged_chance=0.02, client_chance=0.3, started=1700000000):
+        self.rng = random.Random(seed)
+        self.started = started  # Wall-clock time written to the log header
+        self.rate = rate
+        self.abort_chance = abort_chance
+        self.fail_chance = fail_chance
+        self.bugged_chance = bugged_chance
+        self.client_chance = client_chance
+        self.timestamp = 0.0
+
+    def line(self, message):
+        self.timestamp += self.rng.expovariate(self.rate)
+        return f"{self.timestamp:.3f} {message}"
+
+    def noise(self, seconds):
+        end = self.timestamp + seconds
+        while self.timestamp < end:
+            yield self.line(self.rng.choice(NOISE).format(n=self.rng.randint(0, 99999)))
+
+    def bounty(self):
+        rng = self.rng
+        tier = rng.randint(0, 4)
+        stages = [rng.choice(STAGES) for _ in range(3 if tier < 2 else rng.randint(4, 5))]
+        payload = {"jobId": f"/Lotus/Types/Gameplay/Eidolon/Jobs/Events/Tent{rng.choice('ABC')}/Job{tier}", "jobTier": tier,
+                   "jobStages": [f"/Lotus/Types/Gameplay/Eidolon/Jobs/{intro}Bounty" for intro, _ in stages], "job": "Bounty", "isVault": False}
+        mission = json.dumps(payload, separators=(",", ":"))
+
+        yield from self.noise(rng.uniform(5, 30))
+        if rng.random() < self.client_chance:
+            yield self.line("Net [Info]: MatchingServiceWeb::ProcessSquadMessage received MISSION message " + mission)
+            yield from self.noise(rng.uniform(1, 5))
+            yield self.line("Net [Info]: MISSION_READY message: 1")
+        else:
+            yield self.line("Net [Info]: Set squad mission: " + mission)
+            yield from self.noise(rng.uniform(1, 5))
+            yield self.line("Net [Info]: SetSquadMissionReady(1)")
+
+        for intro, win in stages:
+            yield from self.noise(rng.uniform(2, 10))
+            yield self.line(TRANSMISSION.format(intro))
+            yield from self.noise(rng.uniform(20, 120))
+            if rng.random() < self.abort_chance:
+                yield self.line(rng.choice(["Script [Info]: TopMenu.lua: Abort: host/no contest", "Script [Info]: EidolonMP.lua: EIDOLONMP: Going back to hub"]))
+                return
+            if rng.random() < self.fail_chance:
+                yield self.line(TRANSMISSION.format("BountyFail"))
+                return
+            yield self.line(TRANSMISSION.format(win))
+
+        yield from self.noise(rng.uniform(1, 3))
+        yield self.line("Sys [Info]: Created /Lotus/Interface/EidolonMissionComplete.swf")
+        if rng.random() < self.bugged_chance:
+            # Rewards that show up 5 or more lines after the completion screen mark the bounty as bugged
+            for _ in range(rng.randint(5, 8)):
+                yield self.line(rng.choice(NOISE).format(n=rng.randint(0, 99999)))
+        for _ in range(len(stages)):
+            yield self.line(REWARD.format(rng.randint(0, 99)))
+        yield from self.noise(rng.uniform(1, 5))
+        yield self.line("Script [Info]: EidolonMP.lua: EIDOLONMP: Going back to hub")
+
+    def lines(self, runs=None, duration=None):
+        # Bounties until `runs` were emitted or `duration` log seconds passed
+        local, utc = time.localtime(self.started), time.gmtime(self.started)
+        yield self.line(f"Sys [Diag]: Current time: {time.strftime(HEADER_TIME, local)} [UTC: {time.strftime(HEADER_TIME, utc)}]")
+        count = 0
+        while (runs is None or count < runs) and (duration is None or self.timestamp < duration):
+            yield from self.bounty()
+            count += 1
+
+    def write(self, file_name, runs=None, duration=None):
+        with open(file_name, 'w', encoding="utf-8") as write_obj:
+            for line in self.lines(runs, duration):
+                write_obj.write(line + "\n")
+
+def bench_parser(file_name, repeat=3):
+    # Best of `repeat` passes of BountyParser.feed over lines already in memory
+    lines = [line for line in read_log_lines(file_name) if line]
+    best = None
+    for _ in range(repeat):
+        parser = BountyParser([], {}, verbose=False)
+        started = time.perf_counter()
+        for data in lines:
+            parser.feed(data)
+        duration = time.perf_counter() - started
+        best = duration if best is None else min(best, duration)
+    return {"lines": len(lines), "seconds": round(best, 4), "lines_per_sec": round(len(lines) / best), "bounties": parser.bountycycles}
+
+def bench_latency(directory, seed, rate, runs, speedup=200):
+    # Appends generated lines to a live file and times how long tracked lines take to reach the parser,
+    # woken by LogWatcher the way the overlay's data_parser is
+    file_name = os.path.join(directory, "live.log")
+    open(file_name, 'w').close()
+    lines = list(LogGenerator(seed, rate).lines(runs))
+    written = {}
+    done = threading.Event()
+
+    def writer():
+        with open(file_name, 'a', encoding="utf-8") as write_obj:
+            previous = 0.0
+            for line in lines:
+                timestamp = float(line.split(" ", 1)[0])
+                time.sleep(max(timestamp - previous, 0) / speedup)
+                previous = timestamp
+                if classify_line(line) is not None:
+                    written[line] = time.perf_counter()
+                write_obj.write(line + "\n")
+                write_obj.flush()
+        done.set()
+
+    tailer = LogTailer(file_name, from_end=False)
+    watcher = LogWatcher([file_name])
+    parser = BountyParser([], {}, verbose=False)
+    latencies = []
+    thread = threading.Thread(target=writer)
+    thread.start()
+    while True:
+        finished = done.is_set()
+        batch = tailer.read_batch()
+        for data in batch:
+            if not data:
+                continue
+            parser.feed(data)
+            if data in written:
+                latencies.append(time.perf_counter() - written.pop(data))
+        if finished and not batch and not tailer.backlog:
+            break
+        if not tailer.backlog:
+            # The timeout only matters once the writer is done and the file stops changing
+            watcher.wait(0.5)
+    thread.join()
+
+    latencies.sort()
+    def percentile(fraction):
+        return round(latencies[min(int(fraction * len(latencies)), len(latencies) - 1)] * 1000, 2) if latencies else 0
+    return {"events": len(latencies), "p50_ms": percentile(0.5), "p95_ms": percentile(0.95), "max_ms": percentile(1.0)}
+
+def bench_memory(seed, rate, hours):
+    # Streams `hours` of log time through one parser and samples traced memory every simulated hour
+    parser = BountyParser([], {}, verbose=False)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    samples = []
+    next_sample = 3600
+    generator = LogGenerator(seed, rate)
+    for data in generator.lines(duration=hours * 3600):
+        parser.feed(data)
+        if generator.timestamp >= next_sample:
+            samples.append(tracemalloc.get_traced_memory()[0] - baseline)
+            next_sample += 3600
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    growth = samples[-1] - samples[0] if len(samples) > 1 else 0
+    return {"hours": hours, "bounties": parser.bountycycles, "first_hour_kib": round(samples[0] / 1024, 1) if samples else 0,
+            "growth_kib": round(growth / 1024, 1), "per_hour_kib": round(growth / 1024 / max(len(samples) - 1, 1), 1), "peak_kib": round((peak - baseline) / 1024, 1)}
+
+def check_stitching(directory, seed, runs=20, chunk_size=500):
+    # analyze_corpus on tiny chunks must find the same runs as a sequential replay, bugged ones included
+    file_name = os.path.join(directory, "stitch.log")
+    LogGenerator(seed, rate=2, bugged_chance=0.5).write(file_name, runs)
+    with contextlib.redirect_stdout(io.StringIO()):
+        replayed = replay(file_name, [], {})[1]
+        analyzed = analyze_corpus([file_name], [], {}, chunk_size=chunk_size)
+
+    # Bugged completion windows, 5 or more lines before the first reward, that a chunk boundary cuts through
+    with open(file_name, 'rb') as read_obj:
+        data = read_obj.read()
+    bounds = [start for start, end in chunk_offsets(file_name, chunk_size)]
+    crossing = 0
+    position = data.find(COMPLETE)
+    while position != -1:
+        reward = data.find(b"Got Reward:", position)
+        if data.count(b"\n", position, reward) > 5 and any(position < bound <= reward for bound in bounds):
+            crossing += 1
+        position = data.find(COMPLETE, reward)
+    return {"runs": len(replayed), "bugged": sum(run["bugged"] for run in replayed), "crossing_windows": crossing, "match": replayed == analyzed}
+
+def compare(results, baseline_file, tolerance):
+    # Returns the list of metrics that got worse than the baseline by more than `tolerance`
+    with open(baseline_file, 'r', encoding="utf-8") as read_obj:
+        baseline = json.load(read_obj)
+    checks = [("parser", "lines_per_sec", False), ("latency", "p95_ms", True), ("memory", "per_hour_kib", True)]
+    regressions = []
+    for section, metric, lower_is_better in checks:
+        if section not in results or section not in baseline:
+            continue
+        old, new = baseline[section][metric], results[section][metric]
+        worse = new > old * (1 + tolerance) if lower_is_better else new < old * (1 - tolerance)
+        if worse and old:
+            regressions.append(f"{section}.{metric}: {old} -> {new}")
+    return regressions
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Aya Bounty Tracker benchmarks")
+    arg_parser.add_argument("--only", choices=["parser", "latency", "memory", "stitch"], action="append", help="run only these benchmarks")
+    arg_parser.add_argument("--seed", type=int, default=1)
+    arg_parser.add_argument("--rate", type=float, default=40, help="noise lines per second of log time")
+    arg_parser.add_argument("--runs", type=int, default=50, help="bounties in the parser benchmark log")
+    arg_parser.add_argument("--latency-runs", type=int, default=3, help="bounties appended live in the latency benchmark")
+    arg_parser.add_argument("--hours", type=float, default=6, help="simulated session length for the memory benchmark")
+    arg_parser.add_argument("--generate", metavar="FILE", help="only write a generated EE.log to FILE")
+    arg_parser.add_argument("--json", metavar="FILE", help="save the results as JSON")
+    arg_parser.add_argument("--baseline", metavar="FILE", help="fail if results regressed against this JSON")
+    arg_parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression against the baseline (default 0.2)")
+    args = arg_parser.parse_args()
+
+    if args.generate:
+        LogGenerator(args.seed, args.rate).write(args.generate, args.runs)
+        return
+
+    selected = args.only or ["parser", "latency", "memory", "stitch"]
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        if "parser" in selected:
+            file_name = os.path.join(directory, "EE.log")
+            LogGenerator(args.seed, args.rate).write(file_name, args.runs)
+            results["parser"] = bench_parser(file_name)
+            results["parser"]["mib"] = round(os.path.getsize(file_name) / (1 << 20), 1)
+            print(f"Parser: {results['parser']['lines_per_sec']} lines/sec over {results['parser']['lines']} lines ({results['parser']['mib']} MiB)")
+        if "latency" in selected:
+            results["latency"] = bench_latency(directory, args.seed, args.rate, args.latency_runs)
+            print(f"Tail latency: p50 {results['latency']['p50_ms']} ms  p95 {results['latency']['p95_ms']} ms  max {results['latency']['max_ms']} ms over {results['latency']['events']} events")
+        if "stitch" in selected:
+            results["stitch"] = check_stitching(directory, args.seed)
+            stitch = results["stitch"]
+            print(f"Stitching: {stitch['runs']} runs, {stitch['bugged']} bugged, {stitch['crossing_windows']} bugged windows across chunk boundaries, "
+                  f"analyze {'matches' if stitch['match'] else 'DIFFERS FROM'} replay")
+    if "memory" in selected:
+        results["memory"] = bench_memory(args.seed, args.rate, args.hours)
+        print(f"Memory: {results['memory']['per_hour_kib']} KiB/hour growth over {results['memory']['hours']}h, {results['memory']['bounties']} bounties, peak {results['memory']['peak_kib']} KiB")
+
+    stitch = results.get("stitch")
+    if stitch is not None and not (stitch["match"] and stitch["bugged"] and stitch["crossing_windows"]):
+        print("Stitching check failed")
+        sys.exit(1)
+
+    if args.json:
+        with open(args.json, 'w', encoding="utf-8") as write_obj:
+            json.dump(results, write_obj, indent=2)
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()